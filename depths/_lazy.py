@@ -0,0 +1,29 @@
+import importlib
+import sys
+
+
+def lazy_exports(package: str, exports: dict[str, str]) -> tuple:
+    '''
+    Build module-level `__getattr__`/`__dir__` (PEP 562) that import names on first access.
+
+    Keeps `import depths.<package>` cheap: heavy dependencies (numba, openai, deltalake, ...)
+    are only imported once an attribute that needs them is actually used.
+
+    Args:
+        package: __name__ of the package the hooks are installed in.
+        exports: mapping of public attribute name -> relative submodule (e.g. ".delta").
+    Returns:
+        (__getattr__, __dir__) to assign in the package namespace.
+    '''
+    def __getattr__(name: str):
+        submodule = exports.get(name)
+        if submodule is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(submodule, package), name)
+        setattr(sys.modules[package], name, value)
+        return value
+
+    def __dir__() -> list[str]:
+        return sorted(set(vars(sys.modules[package])) | set(exports))
+
+    return __getattr__, __dir__
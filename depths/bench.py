@@ -0,0 +1,331 @@
+import asyncio
+import json
+import os
+import platform
+import resource
+import subprocess
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+BENCH_ROWS = (1000, 10000)
+BENCH_DIMS = (384, 1536)
+BENCH_BATCH_SIZES = (1, 64)
+BENCH_REPEATS = 5
+BENCH_LATENCY_REPEATS = 200
+P99_MIN_SAMPLES = 100
+BENCH_SUITES = ("io", "delta", "quantize", "search", "kcenter")
+REGRESSION_THRESHOLD = 0.10
+
+
+class _PeakRss:
+    '''
+    Context manager sampling the process RSS on a background thread and keeping the peak.
+
+    Uses /proc/self/statm where available (Linux); otherwise falls back to
+    `ru_maxrss`, which is the peak of the whole process lifetime.
+    '''
+    def __init__(self, interval: float = 0.002):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._page_size = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+        self._statm = os.path.exists("/proc/self/statm")
+
+    def _sample(self) -> int:
+        if self._statm:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * self._page_size
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, self._sample())
+
+    def __enter__(self) -> "_PeakRss":
+        self.peak = self._sample()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self._sample())
+
+
+def _measure(
+    name: str,
+    params: Dict[str, Any],
+    op: Callable[[], Any],
+    items: int,
+    repeats: int,
+    unit: str,
+) -> Dict[str, Any]:
+    '''
+    Run `op` once to warm up, then `repeats` times, and summarize the per-call latencies.
+    Throughput is `items` processed per call divided by the median latency. p99 is only
+    reported (otherwise None) with at least P99_MIN_SAMPLES samples; below that it would
+    just be the maximum, which is reported separately.
+    '''
+    op()
+    samples = []
+    with _PeakRss() as rss:
+        for _ in range(repeats):
+            start = time.perf_counter()
+            op()
+            samples.append(time.perf_counter() - start)
+    samples = np.asarray(samples)
+    p50 = float(np.percentile(samples, 50))
+    return {
+        "name": name,
+        "params": params,
+        "repeats": repeats,
+        "p50_ms": p50 * 1e3,
+        "p99_ms": float(np.percentile(samples, 99)) * 1e3 if samples.shape[0] >= P99_MIN_SAMPLES else None,
+        "max_ms": float(samples.max()) * 1e3,
+        "mean_ms": float(samples.mean()) * 1e3,
+        "throughput": items / p50 if p50 > 0 else float("inf"),
+        "unit": unit,
+        "peak_rss_mb": rss.peak / 2**20,
+    }
+
+
+def _unit_vectors(rows: int, dims: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    x = rng.standard_normal((rows, dims)).astype(np.float32)
+    return x / np.linalg.norm(x, axis=1, keepdims=True)
+
+
+def _frame(rows: int, dims: int):
+    import polars as pl
+
+    return pl.DataFrame({
+        "id": np.arange(rows, dtype=np.int64),
+        "embedding": pl.Series("embedding", _unit_vectors(rows, dims)),
+    })
+
+
+def _bench_io(rows: int, dims: int, batch_sizes: Sequence[int], repeats: int, tmp: str) -> Iterator[Dict[str, Any]]:
+    import polars as pl
+
+    from depths.io.arrow import (
+        read_batch_from_file,
+        read_row_from_file,
+        write_batches_stream_ipc,
+        write_per_row_stream_ipc,
+    )
+
+    df = _frame(rows, dims)
+    path = os.path.join(tmp, "rows.arrow")
+    params = {"rows": rows, "dims": dims}
+    yield _measure("io.write_per_row_stream_ipc", params,
+                   lambda: write_per_row_stream_ipc(df, path), rows, repeats, "rows/s")
+
+    index = pl.DataFrame(write_per_row_stream_ipc(df, path))
+    rng = np.random.default_rng(0)
+    yield _measure("io.read_row_from_file", params,
+                   lambda: read_row_from_file(path, int(rng.integers(rows)), index),
+                   1, max(repeats, BENCH_LATENCY_REPEATS), "rows/s")
+
+    for batch_size in batch_sizes:
+        batches = [df[start:start + batch_size] for start in range(0, rows, batch_size)]
+        batch_path = os.path.join(tmp, f"batches-{batch_size}.arrow")
+        batch_params = {**params, "batch_size": batch_size}
+        yield _measure("io.write_batches_stream_ipc", batch_params,
+                       lambda: write_batches_stream_ipc(batches, batch_path), rows, repeats, "rows/s")
+
+        batch_index = pl.DataFrame(write_batches_stream_ipc(batches, batch_path))
+        yield _measure("io.read_batch_from_file", batch_params,
+                       lambda: read_batch_from_file(batch_path, int(rng.integers(len(batches))), batch_index),
+                       min(batch_size, rows), max(repeats, BENCH_LATENCY_REPEATS), "rows/s")
+
+
+def _bench_delta(rows: int, dims: int, batch_sizes: Sequence[int], repeats: int, tmp: str) -> Iterator[Dict[str, Any]]:
+    from depths.io.delta import create_delta, read_delta
+
+    df = _frame(rows, dims)
+    path = os.path.join(tmp, "delta")
+    params = {"rows": rows, "dims": dims}
+    yield _measure("delta.create_delta", params,
+                   lambda: asyncio.run(create_delta(path, df, mode="overwrite")), rows, repeats, "rows/s")
+    yield _measure("delta.read_delta", params,
+                   lambda: asyncio.run(read_delta(path)), rows, repeats, "rows/s")
+    for batch_size in batch_sizes:
+        batch = df[:batch_size]
+        yield _measure("delta.append", {**params, "batch_size": batch_size},
+                       lambda: asyncio.run(create_delta(path, batch, mode="append")),
+                       batch.height, repeats, "rows/s")
+
+
+def _bench_quantize(rows: int, dims: int, batch_sizes: Sequence[int], repeats: int, tmp: str) -> Iterator[Dict[str, Any]]:
+    from depths.index import binary_projection, binary_quantize_batch
+
+    docs = _unit_vectors(rows, dims)
+    Q = binary_projection(dims)
+    for batch_size in batch_sizes:
+        batch = docs[:batch_size]
+        yield _measure("index.binary_quantize_batch", {"rows": rows, "dims": dims, "batch_size": batch_size},
+                       lambda: binary_quantize_batch(batch, Q), batch.shape[0], max(repeats, BENCH_LATENCY_REPEATS),
+                       "vectors/s")
+    yield _measure("index.binary_quantize_batch", {"rows": rows, "dims": dims, "batch_size": rows},
+                   lambda: binary_quantize_batch(docs, Q), rows, repeats, "vectors/s")
+
+
+def _bench_search(rows: int, dims: int, batch_sizes: Sequence[int], repeats: int, tmp: str) -> Iterator[Dict[str, Any]]:
+    from depths.index import binary_quantize_batch, binary_vector_search
+
+    codes = binary_quantize_batch(_unit_vectors(rows, dims))
+    queries = binary_quantize_batch(_unit_vectors(max(batch_sizes), dims, seed=1))
+    for batch_size in batch_sizes:
+        batch = queries[:batch_size]
+        yield _measure("index.binary_vector_search", {"rows": rows, "dims": dims, "batch_size": batch_size},
+                       lambda: binary_vector_search(batch, codes, 10), batch.shape[0], max(repeats, BENCH_LATENCY_REPEATS),
+                       "queries/s")
+
+
+def _bench_kcenter(rows: int, dims: int, batch_sizes: Sequence[int], repeats: int, tmp: str) -> Iterator[Dict[str, Any]]:
+    from depths.index import greedy_k_center
+
+    docs = _unit_vectors(rows, dims)
+    num_clusters = max(1, int(np.sqrt(rows)))
+    yield _measure("index.greedy_k_center", {"rows": rows, "dims": dims, "K": num_clusters},
+                   lambda: greedy_k_center(docs, num_clusters), rows, repeats, "vectors/s")
+
+
+_SUITES = {
+    "io": _bench_io,
+    "delta": _bench_delta,
+    "quantize": _bench_quantize,
+    "search": _bench_search,
+    "kcenter": _bench_kcenter,
+}
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def run_benchmarks(
+    suites: Sequence[str] = BENCH_SUITES,
+    rows: Sequence[int] = BENCH_ROWS,
+    dims: Sequence[int] = BENCH_DIMS,
+    batch_sizes: Sequence[int] = BENCH_BATCH_SIZES,
+    repeats: int = BENCH_REPEATS,
+    progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    '''
+    Run the benchmark suites over every (rows, dims) combination on synthetic data.
+
+    Everything runs offline on local temporary files. Each case is warmed up once (so Numba
+    compilation is not measured), then timed `repeats` times (at least BENCH_LATENCY_REPEATS
+    for per-row/per-batch latency cases, so their p99 is meaningful).
+
+    Args:
+        suites: subset of BENCH_SUITES to run
+        rows: row counts to sweep
+        dims: embedding dimensions to sweep
+        batch_sizes: batch sizes for quantization and search query batches
+        repeats: timed repetitions per case
+        progress: optional callback invoked with each result as it completes
+    Returns:
+        report: {"meta": {...}, "results": [...]} where each result has name, params,
+        p50_ms, p99_ms (None below P99_MIN_SAMPLES samples), max_ms, mean_ms, throughput,
+        unit and peak_rss_mb
+    '''
+    unknown = set(suites) - set(_SUITES)
+    if unknown:
+        raise ValueError(f"Unknown benchmark suites: {sorted(unknown)}")
+
+    results: List[Dict[str, Any]] = []
+    for suite in suites:
+        for n in rows:
+            for d in dims:
+                with tempfile.TemporaryDirectory(prefix="depths-bench-") as tmp:
+                    for result in _SUITES[suite](n, d, batch_sizes, repeats, tmp):
+                        results.append(result)
+                        if progress is not None:
+                            progress(result)
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "suites": list(suites),
+            "rows": list(rows),
+            "dims": list(dims),
+            "batch_sizes": list(batch_sizes),
+            "repeats": repeats,
+        },
+        "results": results,
+    }
+
+
+def _case_key(result: Dict[str, Any]) -> str:
+    return result["name"] + json.dumps(result["params"], sort_keys=True)
+
+
+def compare_benchmarks(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    threshold: float = REGRESSION_THRESHOLD,
+) -> List[Dict[str, Any]]:
+    '''
+    Compare two reports case by case on p50 latency.
+    Returns:
+        rows: one dict per case present in both reports with baseline/current p50,
+        their ratio (current / baseline) and a `regression` flag when the ratio exceeds
+        1 + threshold.
+    '''
+    base = {_case_key(r): r for r in baseline["results"]}
+    rows = []
+    for result in current["results"]:
+        old = base.get(_case_key(result))
+        if old is None:
+            continue
+        ratio = result["p50_ms"] / old["p50_ms"] if old["p50_ms"] > 0 else float("inf")
+        rows.append({
+            "name": result["name"],
+            "params": result["params"],
+            "baseline_p50_ms": old["p50_ms"],
+            "current_p50_ms": result["p50_ms"],
+            "ratio": ratio,
+            "regression": ratio > 1 + threshold,
+        })
+    return rows
+
+
+def format_result(result: Dict[str, Any]) -> str:
+    params = ",".join(f"{k}={v}" for k, v in result["params"].items())
+    tail, tail_ms = ("p99", result["p99_ms"]) if result["p99_ms"] is not None else ("max", result["max_ms"])
+    return (
+        f"{result['name']:<30} {params:<36} p50 {result['p50_ms']:>10.3f} ms"
+        f"  {tail} {tail_ms:>10.3f} ms  {result['throughput']:>14.1f} {result['unit']}"
+        f"  rss {result['peak_rss_mb']:>8.1f} MB"
+    )
+
+
+def format_comparison(rows: List[Dict[str, Any]]) -> str:
+    lines = []
+    for row in rows:
+        params = ",".join(f"{k}={v}" for k, v in row["params"].items())
+        flag = "  REGRESSION" if row["regression"] else ""
+        lines.append(
+            f"{row['name']:<30} {params:<36} {row['baseline_p50_ms']:>10.3f} -> "
+            f"{row['current_p50_ms']:>10.3f} ms  x{row['ratio']:.2f}{flag}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,19 @@
+import argparse
+
+from depths.cli import bench, build_index, evaluate, serve, warmup
+
+COMMANDS = (warmup, serve, bench, evaluate, build_index)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    '''
+    Build the `depths` argument parser with one subcommand per module in COMMANDS.
+
+    Each command module exposes `register(subparsers)`, which adds its parser and
+    sets `func` to the callable that runs it.
+    '''
+    parser = argparse.ArgumentParser(prog="depths", description="Depths: The Data Layer for AI")
+    subparsers = parser.add_subparsers(dest="command")
+    for command in COMMANDS:
+        command.register(subparsers)
+    return parser
@@ -0,0 +1,60 @@
+import argparse
+import json
+import sys
+
+
+def register(subparsers) -> None:
+    parser = subparsers.add_parser("bench", help="Run or compare the offline benchmark suite.")
+    bench = parser.add_subparsers(dest="bench_command", required=True)
+
+    run_parser = bench.add_parser("run", help="Run the benchmarks and write a JSON report.")
+    run_parser.add_argument("--out", default="bench_results.json", help="Path of the JSON report.")
+    run_parser.add_argument("--suites", nargs="+", default=None,
+                            choices=["io", "delta", "quantize", "search", "kcenter"])
+    run_parser.add_argument("--rows", type=int, nargs="+", default=None)
+    run_parser.add_argument("--dims", type=int, nargs="+", default=None)
+    run_parser.add_argument("--batch-sizes", type=int, nargs="+", default=None)
+    run_parser.add_argument("--repeats", type=int, default=None)
+    run_parser.set_defaults(func=run)
+
+    compare_parser = bench.add_parser("compare", help="Compare two JSON reports on p50 latency.")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=None,
+                                help="Relative p50 slowdown flagged as a regression (default: 0.10).")
+    compare_parser.add_argument("--fail-on-regression", action="store_true",
+                                help="Exit with status 1 if any case regressed.")
+    compare_parser.set_defaults(func=compare)
+
+
+def run(args: argparse.Namespace) -> int:
+    from depths import bench
+
+    report = bench.run_benchmarks(
+        suites=args.suites or bench.BENCH_SUITES,
+        rows=args.rows or bench.BENCH_ROWS,
+        dims=args.dims or bench.BENCH_DIMS,
+        batch_sizes=args.batch_sizes or bench.BENCH_BATCH_SIZES,
+        repeats=args.repeats or bench.BENCH_REPEATS,
+        progress=lambda result: print(bench.format_result(result), flush=True),
+    )
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {len(report['results'])} results to {args.out}")
+    return 0
+
+
+def compare(args: argparse.Namespace) -> int:
+    from depths import bench
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    threshold = bench.REGRESSION_THRESHOLD if args.threshold is None else args.threshold
+    rows = bench.compare_benchmarks(baseline, current, threshold)
+    print(bench.format_comparison(rows))
+    if args.fail_on_regression and any(row["regression"] for row in rows):
+        print("Benchmark regressions detected", file=sys.stderr)
+        return 1
+    return 0
@@ -0,0 +1,61 @@
+import argparse
+import json
+
+
+def register(subparsers) -> None:
+    parser = subparsers.add_parser(
+        "build-index",
+        help="Stream an embedding column from a Delta table into a persisted binary index.",
+    )
+    parser.add_argument("table", help="Delta table path.")
+    parser.add_argument("out", help="Output directory (also holds the resumable checkpoint).")
+    parser.add_argument("--column", default="embedding", help="Embedding column.")
+    parser.add_argument("--id-column", default=None, help="Column stored as the row -> id mapping.")
+    parser.add_argument("--batch-rows", type=int, default=None, help="Rows per streamed batch (default: 65536).")
+    parser.add_argument("--workers", type=int, default=None, help="Quantization threads (default: CPU count).")
+    parser.add_argument("--clusters", type=int, default=0,
+                        help="Fit this many k-center centers on a sample and assign every row (0 disables).")
+    parser.add_argument("--assignments", type=int, default=3, help="Centers each row is assigned to.")
+    parser.add_argument("--sample-rows", type=int, default=None,
+                        help="Reservoir sample size used to fit the centers (default: 100000).")
+    parser.add_argument("--no-normalize", action="store_true",
+                        help="Embeddings are not unit-normalized; cluster with full squared distances.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint and start over.")
+    parser.add_argument("--json", action="store_true", help="Print the manifest as JSON.")
+    parser.set_defaults(func=run)
+
+
+def _print_progress(update) -> None:
+    total = update["total_rows"]
+    percent = f" ({100.0 * update['rows'] / total:5.1f}%)" if total else ""
+    print(
+        f"part {update['parts']:>6}  {update['rows']:>12} / {total} rows{percent}"
+        f"  {update['rows_per_second']:>12.0f} rows/s  {update['seconds']:>8.1f} s",
+        flush=True,
+    )
+
+
+def run(args: argparse.Namespace) -> int:
+    from depths.index.build import BUILD_BATCH_ROWS, BUILD_SAMPLE_ROWS, build_index
+
+    manifest = build_index(
+        args.table,
+        args.out,
+        column=args.column,
+        id_column=args.id_column,
+        batch_rows=args.batch_rows or BUILD_BATCH_ROWS,
+        num_workers=args.workers,
+        num_clusters=args.clusters,
+        assignments=args.assignments,
+        sample_rows=args.sample_rows or BUILD_SAMPLE_ROWS,
+        normalized=not args.no_normalize,
+        seed=args.seed,
+        resume=not args.restart,
+        progress=_print_progress,
+    )
+    if args.json:
+        print(json.dumps(manifest, indent=2))
+    else:
+        print(f"Wrote {manifest['rows']} codes ({manifest['dims']} dims) to {args.out}")
+    return 0
@@ -0,0 +1,84 @@
+import argparse
+import json
+
+
+def register(subparsers) -> None:
+    parser = subparsers.add_parser(
+        "eval",
+        help="Measure recall@k and QPS of the binary, scalar and k-center searches against exact ground truth.",
+    )
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--synthetic", type=int, nargs=2, metavar=("DOCS", "DIMS"), default=None,
+                        help="Evaluate on a synthetic clustered set (default: 20000 x 384).")
+    source.add_argument("--delta", default=None, help="Delta table holding the embeddings.")
+    source.add_argument("--ipc", nargs=2, metavar=("FILE", "INDEX"), default=None,
+                        help="IPC file and its index (Parquet or IPC) written by the depths.io.arrow writers.")
+    parser.add_argument("--column", default="embedding", help="Embedding column for --delta/--ipc.")
+    parser.add_argument("--layout", choices=["batch", "row"], default="batch", help="IPC file layout.")
+    parser.add_argument("--limit", type=int, default=None, help="Use at most this many embeddings.")
+    parser.add_argument("--queries", type=int, default=1000,
+                        help="Number of queries (sampled from the embeddings for --delta/--ipc).")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--oversample", type=int, nargs="+", default=[1, 4],
+                        help="Candidate multipliers reranked with exact scores (binary/scalar).")
+    parser.add_argument("--bits", type=int, nargs="+", default=[8], choices=[8, 4])
+    parser.add_argument("--num-centers", type=int, nargs="+", default=[64])
+    parser.add_argument("--probes", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--assignments", type=int, default=3, help="Centers each document is assigned to.")
+    parser.add_argument("--methods", nargs="+", default=["binary", "scalar", "kcenter"],
+                        choices=["binary", "scalar", "kcenter"])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=None, help="Optional path of a JSON report.")
+    parser.set_defaults(func=run)
+
+
+def _load(args: argparse.Namespace):
+    import numpy as np
+    from depths.index import evaluate
+
+    if args.delta is None and args.ipc is None:
+        num_docs, dims = args.synthetic or (20000, 384)
+        return evaluate.synthetic_embeddings(num_docs, args.queries, dims, seed=args.seed)
+
+    if args.delta is not None:
+        docs = evaluate.load_embeddings_delta(args.delta, args.column, limit=args.limit)
+    else:
+        import polars as pl
+
+        path, index_path = args.ipc
+        index = pl.read_parquet(index_path) if index_path.endswith(".parquet") else pl.read_ipc(index_path)
+        docs = evaluate.load_embeddings_ipc(path, index, args.column, args.layout)[:args.limit]
+    docs = docs / np.maximum(np.linalg.norm(docs, axis=1, keepdims=True), 1e-12)
+    rng = np.random.default_rng(args.seed)
+    queries = docs[rng.choice(docs.shape[0], size=min(args.queries, docs.shape[0]), replace=False)]
+    return docs, queries
+
+
+def _configs(args: argparse.Namespace):
+    from depths.index.evaluate import SearchConfig
+
+    configs = []
+    if "binary" in args.methods:
+        configs += [SearchConfig("binary", oversample=o) for o in args.oversample]
+    if "scalar" in args.methods:
+        configs += [SearchConfig("scalar", oversample=o, bits=b) for b in args.bits for o in args.oversample]
+    if "kcenter" in args.methods:
+        configs += [
+            SearchConfig("kcenter", num_centers=k, assignments=args.assignments, num_probes=p)
+            for k in args.num_centers for p in args.probes
+        ]
+    return configs
+
+
+def run(args: argparse.Namespace) -> int:
+    from depths.index import evaluate
+
+    docs, queries = _load(args)
+    print(f"Evaluating {queries.shape[0]} queries against {docs.shape[0]} x {docs.shape[1]} embeddings")
+    report = evaluate.evaluate_search(docs, queries, _configs(args), top_k=args.top_k)
+    print(evaluate.format_report(report))
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {len(report)} results to {args.out}")
+    return 0
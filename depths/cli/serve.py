@@ -0,0 +1,43 @@
+import argparse
+import signal
+import threading
+
+
+def register(subparsers) -> None:
+    parser = subparsers.add_parser(
+        "serve",
+        help="Serve sharded binary search over a memory-mapped code matrix on a Unix socket.",
+    )
+    parser.add_argument("codes", help="Path to a .npy file of packed uint64 codes.")
+    parser.add_argument("--socket", required=True, help="Unix socket path to listen on.")
+    parser.add_argument("--shards", type=int, default=None, help="Number of worker processes (default: CPU count).")
+    parser.add_argument("--max-batch", type=int, default=None, help="Maximum query rows per micro-batch.")
+    parser.add_argument("--max-wait-ms", type=float, default=None, help="Micro-batching window in milliseconds.")
+    parser.add_argument("--cache-entries", type=int, default=0,
+                        help="Cache results of up to this many distinct queries (0 disables).")
+    parser.set_defaults(func=run)
+
+
+def run(args: argparse.Namespace) -> int:
+    from depths.index.cache import SearchCache
+    from depths.index.server import MAX_BATCH, MAX_WAIT, SearchService, UnixSocketServer
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+
+    with SearchService(
+        args.codes,
+        num_shards=args.shards,
+        max_batch=args.max_batch or MAX_BATCH,
+        max_wait=MAX_WAIT if args.max_wait_ms is None else args.max_wait_ms / 1e3,
+        cache=SearchCache(max_entries=args.cache_entries) if args.cache_entries > 0 else None,
+    ) as service:
+        server = UnixSocketServer(service, args.socket).start()
+        print(f"Serving {service.num_docs} codes in {len(service.shards)} shards on {args.socket}")
+        try:
+            stop.wait()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.close()
+    return 0
@@ -0,0 +1,34 @@
+import argparse
+import json
+import os
+
+
+def register(subparsers) -> None:
+    parser = subparsers.add_parser(
+        "warmup",
+        help="Compile (or load from cache) the Numba index kernels and report timings.",
+    )
+    parser.add_argument("--dims", type=int, nargs="+", default=None,
+                        help="Embedding dimensions to exercise (default: 384 768 1536).")
+    parser.add_argument("--dtypes", nargs="+", default=None, choices=["float32", "float64"],
+                        help="Float dtypes to exercise (default: float32 float64).")
+    parser.add_argument("--num-docs", type=int, default=1024)
+    parser.add_argument("--cache-dir", default=None,
+                        help="Numba cache directory (sets NUMBA_CACHE_DIR before compiling).")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    parser.set_defaults(func=run)
+
+
+def run(args: argparse.Namespace) -> int:
+    if args.cache_dir:
+        os.environ["NUMBA_CACHE_DIR"] = args.cache_dir
+
+    from depths.index.warmup import WARMUP_DIMS, WARMUP_DTYPES, format_report, warmup
+
+    report = warmup(
+        dims=args.dims or WARMUP_DIMS,
+        dtypes=args.dtypes or WARMUP_DTYPES,
+        num_docs=args.num_docs,
+    )
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+    return 0
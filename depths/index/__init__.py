@@ -1,8 +1,41 @@
-from kcenter import greedy_k_center_indices, assign_labels_topL
-from binary import binary_search_kernel, pack_signs_to_uint64
-
+import threading
 import numpy as np
-from typing import Optional
+from typing import Optional, Tuple
+
+from depths import metrics
+from depths._lazy import lazy_exports
+
+_EXPORTS = {
+    "MutableBinaryIndex": ".mutable",
+    "SearchCache": ".cache",
+    "SearchService": ".server",
+    "LocalTransport": ".server",
+    "UnixSocketServer": ".server",
+    "UnixSocketTransport": ".server",
+    "save_codes": ".server",
+    "fit_scalar_scales": ".scalar",
+    "scalar_codes_to_frame": ".scalar",
+    "scalar_codes_from_frame": ".scalar",
+    "SearchConfig": ".evaluate",
+    "evaluate_search": ".evaluate",
+    "exact_ground_truth": ".evaluate",
+    "build_index": ".build",
+}
+__all__ = [
+    "greedy_k_center",
+    "binary_projection",
+    "binary_quantize_batch",
+    "binary_vector_search",
+    "scalar_quantize_batch",
+    "scalar_vector_search",
+    *_EXPORTS,
+]
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+# Numba's `workqueue` threading layer (the fallback when neither TBB nor OpenMP is
+# available) aborts when parallel kernels are launched from several threads at once.
+# Every `parallel=True` kernel launch in depths.index holds this lock.
+_KERNEL_LOCK = threading.Lock()
 
 def greedy_k_center(
     docs: np.ndarray,
@@ -10,7 +43,8 @@ def greedy_k_center(
     num_centers: int=3,
     normalized: bool = True,
     start_index: int = 0,
-    dtype = np.float32
+    dtype = np.float32,
+    use_blas: Optional[bool] = None
 ):
     ''''
     Greedy k-center clustering (Gonzalez).
@@ -25,7 +59,12 @@ def greedy_k_center(
         start_index : int, default 0
             Index of the initial center. Any index is valid with the 2-approx guarantee.
         dtype : numpy dtype, default float32
-            X is cast to this dtype before clustering.
+            X is cast to this dtype before clustering. The kernels are compiled
+            for float32 and float64 only.
+        use_blas : bool, optional
+            Assign labels with the blocked matrix-multiply path (`assign_labels_topL_blas`)
+            instead of the per-element Numba kernel. Defaults to True once K reaches
+            BLAS_ASSIGN_MIN_CENTERS.
 
     Returns:
         centers : (K, D) ndarray
@@ -35,12 +74,39 @@ def greedy_k_center(
         centers_idx : (K,) ndarray of int64
             Indices into X for the chosen centers.
     '''
-    docs = np.asarray(docs, dtype=dtype)
+    from .kcenter import (
+        BLAS_ASSIGN_MIN_CENTERS,
+        assign_labels_topL,
+        assign_labels_topL_blas,
+        greedy_k_center_indices,
+    )
+
+    docs = np.ascontiguousarray(docs, dtype=dtype)
     centers_idx = greedy_k_center_indices(docs, int(K), bool(normalized), int(start_index))
-    labels = assign_labels_topL(docs, centers_idx,num_centers, bool(normalized))
+    if use_blas is None:
+        use_blas = centers_idx.shape[0] >= BLAS_ASSIGN_MIN_CENTERS
+    if use_blas:
+        labels = assign_labels_topL_blas(docs, centers_idx, int(num_centers), bool(normalized))
+    else:
+        with _KERNEL_LOCK:
+            labels = assign_labels_topL(docs, centers_idx, int(num_centers), bool(normalized))
     centers = docs[centers_idx].copy()
     return centers, labels, centers_idx
 
+def binary_projection(dims: int, seed: int = 0) -> np.ndarray:
+    '''
+    Seeded random orthogonal projection used by `binary_quantize_batch` when no Q is given.
+    Args:
+        dims: int, vector dimension D
+        seed: int, RNG seed
+    Returns:
+        Q: (D, D) np.float32
+    '''
+    rng = np.random.default_rng(seed)
+    A=rng.standard_normal((dims, dims))
+    Q, _ = np.linalg.qr(A, mode="reduced")
+    return np.ascontiguousarray(Q, dtype=np.float32)
+
 def binary_quantize_batch(vectors: np.ndarray, Q:Optional[np.ndarray]=None):
     '''
     Quantize a batch of vectors to binary format using random projections.
@@ -55,17 +121,19 @@ def binary_quantize_batch(vectors: np.ndarray, Q:Optional[np.ndarray]=None):
     Returns:
         packed: (N, W) np.uint64, packed binary vectors
     '''
+    from .binary import pack_signs_to_uint64
+
     _, dims = vectors.shape
 
     if Q is None:
-        rng = np.random.default_rng(0)
-        A=rng.standard_normal((dims, dims))
-        Q, _ = np.linalg.qr(A, mode="reduced")
+        Q = binary_projection(dims)
     Q=np.ascontiguousarray(Q, dtype=np.float32)
 
-    projections = vectors @ Q
-
-    packed = pack_signs_to_uint64(projections)
+    with metrics.timed("depths_quantize_seconds", kind="binary"):
+        projections = np.ascontiguousarray(vectors @ Q)
+        with _KERNEL_LOCK:
+            packed = pack_signs_to_uint64(projections)
+    metrics.inc("depths_quantize_vectors_total", vectors.shape[0], kind="binary")
     return packed
 
 
@@ -80,6 +148,97 @@ def binary_vector_search(queries: np.ndarray, docs: np.ndarray, top_k: int = 10)
     Returns:
         idxs: (Q, top_k) np.ndarray, indices of the top-k closest documents for each query
     '''
+    from .binary import binary_search_kernel
+
     k = min(top_k, docs.shape[0])
-    idxs = binary_search_kernel(docs, queries, k)
-    return idxs
\ No newline at end of file
+    docs = np.ascontiguousarray(docs, dtype=np.uint64)
+    queries = np.ascontiguousarray(queries, dtype=np.uint64)
+    with metrics.timed("depths_search_seconds", kind="binary"):
+        with _KERNEL_LOCK:
+            idxs = binary_search_kernel(docs, queries, int(k))
+    metrics.inc("depths_search_queries_total", queries.shape[0], kind="binary")
+    return idxs
+
+
+def scalar_quantize_batch(
+    vectors: np.ndarray,
+    scales: Optional[np.ndarray] = None,
+    bits: int = 8
+) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    '''
+    Quantize a batch of vectors to int8 (or packed int4) scalar codes.
+
+    With `scales` (per-dimension, see `fit_scalar_scales`) every dimension is divided by
+    its scale; without it each vector gets its own scale (max |x| / qmax), which is
+    returned so it can be stored next to the codes.
+    int8 codes take 4x less memory than float32, packed int4 codes 8x less.
+
+    Args:
+        vectors: (N, D) np.ndarray, input vectors to quantize
+        scales: (D,) np.ndarray, optional per-dimension scales learned from a sample
+        bits: int, 8 for int8 codes or 4 for two codes packed per byte
+    Returns:
+        codes: (N, D) np.int8, or (N, ceil(D/2)) np.uint8 when bits=4
+        row_scales: (N,) np.float32 per-vector scales, or None when `scales` is given
+    '''
+    from .scalar import qmax_for_bits, quantize_scalar
+
+    vectors = np.asarray(vectors, dtype=np.float32)
+    metrics.inc("depths_quantize_vectors_total", vectors.shape[0], kind=f"int{bits}")
+    with metrics.timed("depths_quantize_seconds", kind=f"int{bits}"):
+        if scales is not None:
+            return quantize_scalar(vectors, np.asarray(scales, dtype=np.float32), bits), None
+
+        row_scales = (np.abs(vectors).max(axis=1) / qmax_for_bits(bits)).astype(np.float32)
+        row_scales[row_scales == 0] = 1.0
+        codes = quantize_scalar(vectors, row_scales[:, None], bits)
+    return codes, row_scales
+
+
+def scalar_vector_search(
+    queries: np.ndarray,
+    codes: np.ndarray,
+    scales: Optional[np.ndarray] = None,
+    row_scales: Optional[np.ndarray] = None,
+    top_k: int = 10,
+    bits: int = 8
+) -> Tuple[np.ndarray, np.ndarray]:
+    '''
+    Inner-product top-k search of float queries against scalar codes.
+    Queries stay in float32; the per-dimension scales are folded into them, so
+    the scores approximate <query, doc> closely enough for reranking.
+    Args:
+        queries: (Q, D) np.ndarray, float query vectors
+        codes: codes returned by `scalar_quantize_batch`
+        scales: (D,) np.ndarray, per-dimension scales used at quantization time
+        row_scales: (N,) np.ndarray, per-vector scales returned by `scalar_quantize_batch`
+        top_k: int, number of top results to return for each query
+        bits: int, code width used at quantization time (8 or 4)
+    Returns:
+        idxs: (Q, top_k) np.int64, indices of the highest scoring documents, best first
+        scores: (Q, top_k) np.float32, approximate inner products
+    Raises:
+        ValueError: if the query width, code dtype or scale lengths do not match the codes
+    '''
+    from .scalar import check_search_inputs, qmax_for_bits, scalar_topk
+
+    qmax_for_bits(bits)
+    queries = np.asarray(queries, dtype=np.float32)
+    check_search_inputs(queries, codes, scales, row_scales, bits)
+    if scales is not None:
+        queries = queries * np.asarray(scales, dtype=np.float32)
+    if bits == 4:
+        padded = np.zeros((queries.shape[0], 2 * codes.shape[1]), dtype=np.float32)
+        padded[:, :queries.shape[1]] = queries
+        queries = padded
+    queries = np.ascontiguousarray(queries, dtype=np.float32)
+
+    if row_scales is None:
+        row_scales = np.empty(0, dtype=np.float32)
+    row_scales = np.ascontiguousarray(row_scales, dtype=np.float32)
+
+    k = min(top_k, codes.shape[0])
+    with metrics.timed("depths_search_seconds", kind=f"int{bits}"):
+        result = scalar_topk(np.ascontiguousarray(codes), queries, row_scales, int(k), bits)
+    metrics.inc("depths_search_queries_total", queries.shape[0], kind=f"int{bits}")
+    return result
@@ -1,7 +1,32 @@
-from numba import njit, prange
+from numba import njit, prange, types
+from numba import int16, int32, int64, uint64, float32, float64, void
 import numpy as np
 
-@njit(nogil=True)
+readonly_uint64_2d = types.Array(uint64, 2, "C", readonly=True)
+
+HEAP_PUSH_SIGNATURES = [
+    void(int16[::1], int32[::1], int64, int64, int64),
+]
+HEAP_REPLACE_SIGNATURES = [
+    void(int16[::1], int32[::1], int64, int64),
+]
+# Docs and queries may each be read-only (mmapped .npy, np.frombuffer, Arrow zero-copy).
+BINARY_SEARCH_SIGNATURES = [
+    int32[:, ::1](docs, queries, int64)
+    for docs in (uint64[:, ::1], readonly_uint64_2d)
+    for queries in (uint64[:, ::1], readonly_uint64_2d)
+]
+BINARY_SEARCH_MASKED_SIGNATURES = [
+    types.Tuple((int32[:, ::1], int16[:, ::1]))(docs, queries, int64, uint64[::1])
+    for docs in (uint64[:, ::1], readonly_uint64_2d)
+    for queries in (uint64[:, ::1], readonly_uint64_2d)
+]
+PACK_SIGNS_SIGNATURES = [
+    uint64[:, ::1](float32[:, ::1]),
+    uint64[:, ::1](float64[:, ::1]),
+]
+
+@njit(HEAP_PUSH_SIGNATURES, nogil=True, cache=True)
 def heap_push(heap_distances, heap_indices, dist, index, pos):
     '''
     Utility function to push a new item into a max-heap.
@@ -28,7 +53,7 @@ def heap_push(heap_distances, heap_indices, dist, index, pos):
         else:
             break
 
-@njit(nogil=True)
+@njit(HEAP_REPLACE_SIGNATURES, nogil=True, cache=True)
 def heap_replace(heap_distances, heap_indices, dist, index):
     '''
     Utility function to replace the root of a max-heap with a new item.
@@ -64,7 +89,7 @@ def heap_replace(heap_distances, heap_indices, dist, index):
         else:
             break
 
-@njit(nogil=True,cache=True)
+@njit(uint64(uint64), nogil=True, cache=True)
 def popcount_u64(x):
     '''
     Utility function to count the number of set bits in a 64-bit unsigned integer.
@@ -79,7 +104,7 @@ def popcount_u64(x):
     x = (x + (x >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
     return (x * np.uint64(0x0101010101010101)) >> np.uint64(56)
 
-@njit(parallel=True, nogil=True, cache=True)
+@njit(BINARY_SEARCH_SIGNATURES, parallel=True, nogil=True, cache=True)
 def binary_search_kernel(docs, queries, k):
     '''
     Utility to perform efficient top-k search for a batch of queries against a set of documents
@@ -107,9 +132,9 @@ def binary_search_kernel(docs, queries, k):
         current_top_distances = top_k_distances[j]
         
         for i in range(D):
-            dist = np.int16(0)
+            dist = 0
             for w in range(W):
-                dist += popcount_u64(docs[i, w] ^ q_vec[w])
+                dist += np.int64(popcount_u64(docs[i, w] ^ q_vec[w]))
 
             if i < k:
                 heap_push(current_top_distances, current_top_indices, dist, i, i)
@@ -123,6 +148,59 @@ def binary_search_kernel(docs, queries, k):
 
     return top_k_indices
 
+@njit(BINARY_SEARCH_MASKED_SIGNATURES, parallel=True, nogil=True, cache=True)
+def binary_search_kernel_masked(docs, queries, k, tombstones):
+    '''
+    Variant of `binary_search_kernel` that skips deleted documents and also returns distances.
+
+    Deleted documents are marked in a packed bitmap: document i is skipped when bit (i & 63)
+    of tombstones[i >> 6] is set. An empty bitmap disables the check. If fewer than k
+    documents are live, the remaining slots hold index -1 and distance int16 max.
+
+    Args:
+        docs: (D, W) np.ndarray, binary document vectors
+        queries: (Q, W) np.ndarray, binary query vectors
+        k: int, number of top results to return for each query
+        tombstones: (ceil(D / 64),) np.uint64 deletion bitmap, or empty
+    Returns:
+        top_k_indices: (Q, k) np.int32, indices of the top-k closest live documents
+        top_k_distances: (Q, k) np.int16, corresponding Hamming distances
+    '''
+    Q, D, W = queries.shape[0], docs.shape[0], docs.shape[1]
+    has_tombstones = tombstones.shape[0] > 0
+
+    top_k_indices = np.full((Q, k), -1, dtype=np.int32)
+    top_k_distances = np.full((Q, k), np.iinfo(np.int16).max, dtype=np.int16)
+
+    for j in prange(Q):
+        q_vec = queries[j]
+
+        current_top_indices = top_k_indices[j]
+        current_top_distances = top_k_distances[j]
+
+        filled = 0
+        for i in range(D):
+            if has_tombstones and (tombstones[i >> 6] >> np.uint64(i & 63)) & np.uint64(1):
+                continue
+
+            dist = 0
+            for w in range(W):
+                dist += np.int64(popcount_u64(docs[i, w] ^ q_vec[w]))
+
+            if filled < k:
+                heap_push(current_top_distances, current_top_indices, dist, i, filled)
+                filled += 1
+            elif dist < current_top_distances[0]:
+                heap_replace(current_top_distances, current_top_indices, dist, i)
+
+    for j in range(Q):
+        sorted_indices = np.argsort(top_k_distances[j], kind="mergesort")
+        top_k_distances[j] = top_k_distances[j][sorted_indices]
+        top_k_indices[j] = top_k_indices[j][sorted_indices]
+
+    return top_k_indices, top_k_distances
+
+@njit(PACK_SIGNS_SIGNATURES, parallel=True, nogil=True, cache=True)
 def pack_signs_to_uint64(proj):
     '''
     Utility to pack a 2D array of float32 signs into a 2D array of uint64.
@@ -142,4 +220,26 @@ def pack_signs_to_uint64(proj):
                 word = j >> 6
                 bitpos = j & 63
                 out[i, word] |= (np.uint64(1) << np.uint64(bitpos))
-    return out
\ No newline at end of file
+    return out
+
+def merge_topk(ids_parts, dist_parts, top_k):
+    '''
+    Merge per-segment (or per-shard) top-k results into a global top-k.
+    Args:
+        ids_parts: list of (Q, k_i) int arrays, -1 for empty slots
+        dist_parts: list of (Q, k_i) int16 arrays, distances matching ids_parts
+        top_k: int, number of results to keep per query
+    Returns:
+        ids: (Q, top_k) np.int64, padded with -1 when fewer results exist
+        distances: (Q, top_k) np.int16, padded with int16 max
+    '''
+    ids = np.concatenate([np.asarray(part, dtype=np.int64) for part in ids_parts], axis=1)
+    dists = np.concatenate(dist_parts, axis=1).astype(np.int16, copy=False)
+    order = np.argsort(dists, axis=1, kind="stable")[:, :top_k]
+    ids = np.take_along_axis(ids, order, axis=1)
+    dists = np.take_along_axis(dists, order, axis=1)
+    if ids.shape[1] < top_k:
+        pad = top_k - ids.shape[1]
+        ids = np.pad(ids, ((0, 0), (0, pad)), constant_values=-1)
+        dists = np.pad(dists, ((0, 0), (0, pad)), constant_values=np.iinfo(np.int16).max)
+    return ids, dists
@@ -0,0 +1,426 @@
+import json
+import os
+import shutil
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from depths import metrics
+from depths.index import _KERNEL_LOCK
+
+BUILD_BATCH_ROWS = 65536
+BUILD_SAMPLE_ROWS = 100_000
+CHECKPOINT_FILE = "checkpoint.json"
+ROW_ID_COLUMN = "row"
+
+
+def _batch_to_matrix(column, dims: Optional[int] = None) -> np.ndarray:
+    '''
+    (rows, D) float32 copy of an Arrow FixedSizeList/List embedding column.
+    '''
+    import pyarrow as pa
+
+    if column.null_count:
+        raise ValueError("Embedding column contains nulls")
+    if pa.types.is_fixed_size_list(column.type):
+        width = column.type.list_size
+    else:
+        lengths = column.value_lengths().to_numpy(zero_copy_only=False)
+        width = int(lengths[0]) if lengths.size else (dims or 0)
+        if lengths.size and np.any(lengths != width):
+            raise ValueError("Embedding column has rows of different lengths")
+    if dims is not None and width != dims:
+        raise ValueError(f"Expected embeddings with {dims} dims, got {width}")
+    values = column.flatten().to_numpy(zero_copy_only=False)
+    return np.array(values.reshape(-1, width), dtype=np.float32, order="C")
+
+
+def _write_atomic(path: str, write: Callable[[str], None]) -> None:
+    tmp = path + ".tmp"
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def _save_npy(path: str, array: np.ndarray) -> None:
+    def write(tmp: str) -> None:
+        with open(tmp, "wb") as f:
+            np.save(f, array)
+    _write_atomic(path, write)
+
+
+def _save_json(path: str, payload: Dict[str, Any]) -> None:
+    def write(tmp: str) -> None:
+        with open(tmp, "w") as f:
+            json.dump(payload, f, indent=2)
+    _write_atomic(path, write)
+
+
+class _Source:
+    '''
+    Snapshot of one Delta table version, read as a stream of Arrow record batches.
+
+    Pinning the version keeps the data files (fragments) and their order identical across
+    runs, which is what lets a resumed build start at the first unfinished file without
+    reading the ones it already processed.
+    '''
+    def __init__(
+        self,
+        table_path: str,
+        column: str,
+        id_column: Optional[str],
+        batch_rows: int,
+        storage_options: Optional[Dict[str, str]] = None,
+        version: Optional[int] = None,
+    ):
+        from deltalake import DeltaTable
+
+        self.table = DeltaTable(table_path, version=version, storage_options=storage_options)
+        self.version = self.table.version()
+        self.column = column
+        self.id_column = id_column
+        self.batch_rows = batch_rows
+        self.dataset = self.table.to_pyarrow_dataset()
+
+    def count_rows(self) -> int:
+        return self.dataset.count_rows()
+
+    def _columns(self, with_ids: bool) -> List[str]:
+        columns = [self.column]
+        if with_ids and self.id_column is not None:
+            columns.append(self.id_column)
+        return columns
+
+    def batches(self, with_ids: bool = True) -> Iterator[Any]:
+        return self.dataset.to_batches(columns=self._columns(with_ids), batch_size=self.batch_rows)
+
+    def fragments(self) -> List[Any]:
+        return list(self.dataset.get_fragments())
+
+    def fragment_batches(self, fragment, with_ids: bool = True) -> Iterator[Any]:
+        '''
+        Batches of one data file. Scanning with the dataset schema fills in partition columns.
+        '''
+        import pyarrow.dataset as ds
+
+        scanner = ds.Scanner.from_fragment(
+            fragment, schema=self.dataset.schema, columns=self._columns(with_ids), batch_size=self.batch_rows
+        )
+        return scanner.to_batches()
+
+
+def _reservoir_sample(source: _Source, sample_rows: int, seed: int) -> np.ndarray:
+    '''
+    Uniform sample of up to `sample_rows` embeddings in one streaming pass
+    (each row gets a random key; the `sample_rows` smallest keys are kept).
+    '''
+    rng = np.random.default_rng(seed)
+    sample = np.empty((0, 0), dtype=np.float32)
+    keys = np.empty(0, dtype=np.float64)
+    for batch in source.batches(with_ids=False):
+        vectors = _batch_to_matrix(batch.column(0), sample.shape[1] or None)
+        batch_keys = rng.random(vectors.shape[0])
+        if sample.size:
+            vectors = np.concatenate([sample, vectors])
+            batch_keys = np.concatenate([keys, batch_keys])
+        if batch_keys.shape[0] > sample_rows:
+            keep = np.argpartition(batch_keys, sample_rows - 1)[:sample_rows]
+            vectors, batch_keys = vectors[keep], batch_keys[keep]
+        sample, keys = vectors, batch_keys
+    return sample
+
+
+def _process_batch(
+    batch,
+    column: str,
+    id_column: Optional[str],
+    start_row: int,
+    Q: np.ndarray,
+    centers: Optional[np.ndarray],
+    assignments: int,
+    normalized: bool,
+) -> Tuple[np.ndarray, Any, Optional[np.ndarray]]:
+    from .binary import pack_signs_to_uint64
+    from .kcenter import assign_labels_to_centers
+
+    vectors = _batch_to_matrix(batch.column(column), Q.shape[0])
+    with metrics.timed("depths_quantize_seconds", kind="binary"):
+        projections = np.ascontiguousarray(vectors @ Q)
+        # Only the projection matmul runs concurrently; see `_KERNEL_LOCK`.
+        with _KERNEL_LOCK:
+            codes = pack_signs_to_uint64(projections)
+    metrics.inc("depths_quantize_vectors_total", vectors.shape[0], kind="binary")
+
+    if id_column is not None:
+        ids = batch.column(id_column)
+    else:
+        ids = np.arange(start_row, start_row + vectors.shape[0], dtype=np.int64)
+
+    labels = None
+    if centers is not None:
+        labels = assign_labels_to_centers(vectors, centers, assignments, normalized)
+    return codes, ids, labels
+
+
+def _part_path(parts_dir: str, kind: str, part: int, ext: str = "npy") -> str:
+    return os.path.join(parts_dir, f"{kind}-{part:06d}.{ext}")
+
+
+def build_index(
+    table_path: str,
+    out_dir: str,
+    column: str = "embedding",
+    id_column: Optional[str] = None,
+    batch_rows: int = BUILD_BATCH_ROWS,
+    num_workers: Optional[int] = None,
+    num_clusters: int = 0,
+    assignments: int = 3,
+    sample_rows: int = BUILD_SAMPLE_ROWS,
+    normalized: bool = True,
+    seed: int = 0,
+    storage_options: Optional[Dict[str, str]] = None,
+    resume: bool = True,
+    progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    '''
+    Build a persisted binary index from an embedding column of a Delta table.
+
+    The table is streamed as Arrow record batches of `batch_rows` rows from a pinned table
+    version, so memory stays bounded by roughly `2 * num_workers` batches regardless of
+    table size. Batches are quantized on a thread pool while the next ones are read, and
+    each finished batch is written as a part file. Once every batch of a data file is
+    written, `checkpoint.json` records the file boundary (files done, parts and rows so
+    far); an interrupted build started again with the same arguments resumes at the first
+    unfinished file, so at most one file is read twice. With `num_clusters > 0`, k-center centers are fitted on a
+    reservoir sample of `sample_rows` embeddings (one extra streaming pass) and every row
+    is assigned to its `assignments` nearest centers.
+
+    Output files in `out_dir`:
+        codes.npy: (N, W) uint64 packed codes, loadable by `SearchService`
+        ids.parquet: row i of codes.npy -> `id_column` value (or the row number)
+        projection.npy: (D, D) float32 projection used for queries
+        centers.npy, labels.npy: (K, D) centers and (N, L) int32 labels, when clustering
+        manifest.json: build parameters, table version and row counts
+
+    Args:
+        table_path: str, Delta table path (local or object store)
+        out_dir: str, output directory
+        column: str, embedding column (FixedSizeList or List of floats)
+        id_column: str, optional column stored as the id mapping
+        batch_rows: int, rows per streamed batch
+        num_workers: int, quantization threads (default: CPU count)
+        num_clusters: int, number of k-center centers (0 disables clustering)
+        assignments: int, centers each row is assigned to
+        sample_rows: int, reservoir sample size used to fit the centers
+        normalized: bool, whether embeddings are unit-normalized; if False, clustering
+            uses full squared distances instead of the unit-norm shortcut 2 - 2 * <x, c>
+        seed: int, seed of the projection matrix and the sample
+        storage_options: optional storage options for the Delta table
+        resume: bool, continue from an existing checkpoint in `out_dir`
+        progress: optional callback invoked after each part with
+            {"rows", "total_rows", "parts", "seconds", "rows_per_second"}
+    Returns:
+        manifest: dict, the contents of manifest.json
+    '''
+    import polars as pl
+    import pyarrow as pa
+
+    from . import binary_projection, greedy_k_center
+    # Load the kernel modules on this thread: Numba kernels first loaded from a pool
+    # thread leave the interpreter hanging at exit.
+    from . import binary, kcenter
+
+    parts_dir = os.path.join(out_dir, "parts")
+    os.makedirs(parts_dir, exist_ok=True)
+    checkpoint_path = os.path.join(out_dir, CHECKPOINT_FILE)
+    params = {
+        "table_path": table_path,
+        "column": column,
+        "id_column": id_column,
+        "batch_rows": int(batch_rows),
+        "num_clusters": int(num_clusters),
+        "assignments": int(assignments),
+        "sample_rows": int(sample_rows),
+        "normalized": bool(normalized),
+        "seed": int(seed),
+    }
+
+    checkpoint = None
+    if resume and os.path.exists(checkpoint_path):
+        with open(checkpoint_path) as f:
+            checkpoint = json.load(f)
+        changed = {k for k, v in params.items() if checkpoint["params"].get(k) != v}
+        if changed:
+            raise ValueError(f"Checkpoint in {out_dir} was written with different {sorted(changed)}; "
+                             f"start over with resume=False (--restart)")
+        if checkpoint.get("finished"):
+            with open(os.path.join(out_dir, "manifest.json")) as f:
+                return json.load(f)
+
+    source = _Source(table_path, column, id_column, batch_rows, storage_options,
+                     version=checkpoint["version"] if checkpoint else None)
+    total_rows = source.count_rows()
+
+    if checkpoint is None:
+        field_type = source.dataset.schema.field(column).type
+        if pa.types.is_fixed_size_list(field_type):
+            dims = field_type.list_size
+        else:
+            first = source.dataset.head(1, columns=[column]).column(0).combine_chunks()
+            dims = _batch_to_matrix(first).shape[1] if len(first) else 0
+        for stale in ("centers.npy", "labels.npy", "manifest.json"):
+            if os.path.exists(os.path.join(out_dir, stale)):
+                os.remove(os.path.join(out_dir, stale))
+        shutil.rmtree(parts_dir)
+        os.makedirs(parts_dir)
+        Q = binary_projection(dims, seed)
+        _save_npy(os.path.join(out_dir, "projection.npy"), Q)
+        if num_clusters > 0 and total_rows:
+            sample = _reservoir_sample(source, sample_rows, seed)
+            centers, _, _ = greedy_k_center(sample, num_clusters, num_centers=assignments, normalized=normalized)
+            _save_npy(os.path.join(out_dir, "centers.npy"), np.ascontiguousarray(centers, dtype=np.float32))
+        checkpoint = {"params": params, "version": source.version, "dims": dims,
+                      "fragments": 0, "parts": 0, "rows": 0, "finished": False}
+        _save_json(checkpoint_path, checkpoint)
+
+    Q = np.load(os.path.join(out_dir, "projection.npy"))
+    centers_path = os.path.join(out_dir, "centers.npy")
+    centers = np.load(centers_path) if num_clusters > 0 and os.path.exists(centers_path) else None
+
+    fragments = source.fragments()
+    done_fragments = checkpoint["fragments"]
+    expected = checkpoint.get("next_fragment")
+    if expected is not None and (done_fragments >= len(fragments) or fragments[done_fragments].path != expected):
+        raise ValueError(f"Checkpoint in {out_dir} expects data file {expected} next; "
+                         f"start over with resume=False (--restart)")
+    done_parts, rows = checkpoint["parts"], checkpoint["rows"]
+    start = time.perf_counter()
+    resumed_rows = rows
+
+    def write_part(part: int, result: Tuple[np.ndarray, Any, Optional[np.ndarray]]) -> None:
+        codes, ids, labels = result
+        _save_npy(_part_path(parts_dir, "codes", part), codes)
+        if labels is not None:
+            _save_npy(_part_path(parts_dir, "labels", part), labels)
+        id_name = id_column or ROW_ID_COLUMN
+        ids_table = pa.table({id_name: ids})
+        _write_atomic(_part_path(parts_dir, "ids", part, "parquet"),
+                      lambda tmp: pl.from_arrow(ids_table).write_parquet(tmp))
+
+    workers = max(1, num_workers or os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="depths-build") as pool:
+        # Entries are (part, rows, future) for batches and (None, fragment, None) for the
+        # end of a data file, which is when the checkpoint advances.
+        pending: "deque[Tuple[Optional[int], int, Any]]" = deque()
+
+        def drain(limit: int) -> None:
+            nonlocal done_parts, rows
+            while len(pending) > limit:
+                part, count, future = pending.popleft()
+                if part is None:
+                    following = fragments[count + 1].path if count + 1 < len(fragments) else None
+                    checkpoint.update(fragments=count + 1, next_fragment=following, parts=done_parts, rows=rows)
+                    _save_json(checkpoint_path, checkpoint)
+                    continue
+                write_part(part, future.result())
+                done_parts, rows = part + 1, rows + count
+                metrics.inc("depths_index_build_rows_total", count)
+                if progress is not None:
+                    seconds = time.perf_counter() - start
+                    progress({
+                        "rows": rows,
+                        "total_rows": total_rows,
+                        "parts": done_parts,
+                        "seconds": seconds,
+                        "rows_per_second": (rows - resumed_rows) / seconds if seconds > 0 else 0.0,
+                    })
+
+        part, next_row = done_parts, rows
+        for index in range(done_fragments, len(fragments)):
+            for batch in source.fragment_batches(fragments[index]):
+                if not batch.num_rows:
+                    continue
+                future = pool.submit(_process_batch, batch, column, id_column, next_row, Q, centers,
+                                     assignments, normalized)
+                pending.append((part, batch.num_rows, future))
+                part, next_row = part + 1, next_row + batch.num_rows
+                drain(2 * workers)
+            pending.append((None, index, None))
+        drain(0)
+
+    manifest = _finalize(out_dir, parts_dir, done_parts, rows, checkpoint, source.version,
+                         time.perf_counter() - start)
+    checkpoint["finished"] = True
+    _save_json(checkpoint_path, checkpoint)
+    shutil.rmtree(parts_dir, ignore_errors=True)
+    return manifest
+
+
+def _finalize(
+    out_dir: str,
+    parts_dir: str,
+    num_parts: int,
+    num_rows: int,
+    checkpoint: Dict[str, Any],
+    version: int,
+    seconds: float,
+) -> Dict[str, Any]:
+    '''
+    Concatenate the part files into codes.npy / labels.npy / ids.parquet one part at a
+    time (through memory-mapped outputs), then write manifest.json.
+    '''
+    import polars as pl
+
+    params = checkpoint["params"]
+    words = (checkpoint["dims"] + 63) // 64
+
+    codes = np.lib.format.open_memmap(os.path.join(out_dir, "codes.npy.tmp"), mode="w+",
+                                       dtype=np.uint64, shape=(num_rows, words))
+    labels = None
+    clustered = params["num_clusters"] > 0 and os.path.exists(os.path.join(out_dir, "centers.npy"))
+    if clustered:
+        L = min(params["assignments"], np.load(os.path.join(out_dir, "centers.npy"), mmap_mode="r").shape[0])
+        labels = np.lib.format.open_memmap(os.path.join(out_dir, "labels.npy.tmp"), mode="w+",
+                                            dtype=np.int32, shape=(num_rows, L))
+    offset = 0
+    for part in range(num_parts):
+        block = np.load(_part_path(parts_dir, "codes", part))
+        codes[offset:offset + block.shape[0]] = block
+        if labels is not None:
+            labels[offset:offset + block.shape[0]] = np.load(_part_path(parts_dir, "labels", part))
+        offset += block.shape[0]
+    codes.flush()
+    del codes
+    os.replace(os.path.join(out_dir, "codes.npy.tmp"), os.path.join(out_dir, "codes.npy"))
+    if clustered:
+        labels.flush()
+        del labels
+        os.replace(os.path.join(out_dir, "labels.npy.tmp"), os.path.join(out_dir, "labels.npy"))
+
+    id_name = params["id_column"] or ROW_ID_COLUMN
+    ids_path = os.path.join(out_dir, "ids.parquet")
+    if num_parts:
+        _write_atomic(ids_path, lambda tmp: pl.scan_parquet(
+            [_part_path(parts_dir, "ids", part, "parquet") for part in range(num_parts)]
+        ).sink_parquet(tmp))
+    else:
+        _write_atomic(ids_path, lambda tmp: pl.DataFrame({id_name: np.empty(0, dtype=np.int64)}).write_parquet(tmp))
+
+    manifest = {
+        **params,
+        "table_version": version,
+        "rows": num_rows,
+        "dims": checkpoint["dims"],
+        "words": words,
+        "seconds": seconds,
+        "files": {
+            "codes": "codes.npy",
+            "ids": "ids.parquet",
+            "projection": "projection.npy",
+            **({"centers": "centers.npy", "labels": "labels.npy"} if clustered else {}),
+        },
+    }
+    _save_json(os.path.join(out_dir, "manifest.json"), manifest)
+    return manifest
@@ -0,0 +1,139 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+
+from depths import metrics
+
+CACHE_MAX_ENTRIES = 100_000
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+
+class SearchCache:
+    '''
+    LRU cache of per-query search results, invalidated by an index version counter.
+
+    Entries are keyed by a hash of the packed query code, top_k and an optional filter.
+    Every lookup and store carries the index version: when it differs from the version the
+    cache was filled under, the whole cache is dropped (any add/delete can change any
+    result), so callers only need to bump their version on mutations.
+
+    Args:
+        max_entries: int, maximum number of cached query rows
+        max_bytes: int, maximum total size of cached result arrays
+    '''
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, max_bytes: int = CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[bytes, Tuple[np.ndarray, np.ndarray]]" = OrderedDict()
+        self._bytes = 0
+        self._version: Optional[int] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(code: np.ndarray, top_k: int, filter: Optional[Hashable] = None) -> bytes:
+        '''
+        Hash of a single packed query code, top_k and filter (filters are hashed by repr).
+        '''
+        digest = hashlib.blake2b(np.ascontiguousarray(code).tobytes(), digest_size=16)
+        digest.update(int(top_k).to_bytes(8, "little"))
+        if filter is not None:
+            digest.update(repr(filter).encode())
+        return digest.digest()
+
+    def _sync_version(self, version: int) -> None:
+        if self._version != version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._bytes = 0
+            self._version = version
+
+    def get(self, key: bytes, version: int) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        with self._lock:
+            self._sync_version(version)
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                metrics.inc("depths_search_cache_misses_total")
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            metrics.inc("depths_search_cache_hits_total")
+            return value
+
+    def put(self, key: bytes, value: Tuple[np.ndarray, np.ndarray], version: int) -> None:
+        size = sum(part.nbytes for part in value)
+        with self._lock:
+            if self._version is not None and version < self._version:
+                return
+            self._sync_version(version)
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= sum(part.nbytes for part in old)
+            self._entries[key] = value
+            self._bytes += size
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= sum(part.nbytes for part in evicted)
+                self.evictions += 1
+
+    def search(
+        self,
+        queries: np.ndarray,
+        top_k: int,
+        search_fn: Callable[[np.ndarray, int], Tuple[np.ndarray, np.ndarray]],
+        version: int,
+        filter: Optional[Hashable] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        '''
+        Serve each query row from the cache when possible and run `search_fn` once on the
+        remaining rows.
+        Args:
+            queries: (Q, W) np.uint64, packed query codes
+            top_k: int, number of results per query
+            search_fn: callable (queries, top_k) -> (ids, distances), the uncached search
+            version: int, current index version
+            filter: optional hashable filter that is part of the key
+        Returns:
+            ids, distances: (Q, top_k) arrays, as returned by `search_fn`
+        '''
+        if queries.shape[0] == 0:
+            return search_fn(queries, top_k)
+        keys = [self.make_key(code, top_k, filter) for code in queries]
+        cached = [self.get(key, version) for key in keys]
+        missing = [i for i, value in enumerate(cached) if value is None]
+        if missing:
+            ids, dists = search_fn(queries[missing], top_k)
+            for row, i in enumerate(missing):
+                cached[i] = (ids[row].copy(), dists[row].copy())
+                self.put(keys[i], cached[i], version)
+        return np.stack([value[0] for value in cached]), np.stack([value[1] for value in cached])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        '''
+        Hit/miss counters, hit rate and current size.
+        '''
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "version": self._version,
+            }
@@ -0,0 +1,310 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+GROUND_TRUTH_CHUNK_ROWS = 16384
+GROUND_TRUTH_QUERY_BLOCK = 256
+SEARCH_METHODS = ("binary", "scalar", "kcenter")
+
+
+class SearchConfig:
+    '''
+    One search configuration to evaluate.
+
+    Args:
+        method: "binary" (Hamming search over sign codes), "scalar" (int8/int4 codes)
+            or "kcenter" (cluster-pruned exact search)
+        oversample: int, for binary/scalar, fetch top_k * oversample candidates and
+            rerank them with exact float scores (1 = no rerank)
+        bits: int, scalar code width (8 or 4)
+        num_centers: int, number of k-center clusters
+        assignments: int, centers each document is assigned to (L in `assign_labels_topL`)
+        num_probes: int, nearest centers probed per query
+    '''
+    def __init__(
+        self,
+        method: str = "binary",
+        oversample: int = 1,
+        bits: int = 8,
+        num_centers: int = 64,
+        assignments: int = 3,
+        num_probes: int = 4,
+    ):
+        if method not in SEARCH_METHODS:
+            raise ValueError(f"method must be one of {SEARCH_METHODS}, got {method!r}")
+        self.method = method
+        self.oversample = max(1, int(oversample))
+        self.bits = bits
+        self.num_centers = num_centers
+        self.assignments = assignments
+        self.num_probes = num_probes
+
+    @property
+    def name(self) -> str:
+        if self.method == "binary":
+            return f"binary(oversample={self.oversample})"
+        if self.method == "scalar":
+            return f"int{self.bits}(oversample={self.oversample})"
+        return f"kcenter(K={self.num_centers},L={self.assignments},probes={self.num_probes})"
+
+    def build_key(self) -> Tuple:
+        '''
+        Configurations with the same key share one index build.
+        '''
+        if self.method == "binary":
+            return ("binary",)
+        if self.method == "scalar":
+            return ("scalar", self.bits)
+        return ("kcenter", self.num_centers, self.assignments)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(vars(self))
+
+
+def exact_ground_truth(
+    queries: np.ndarray,
+    docs: np.ndarray,
+    top_k: int = 10,
+    chunk_rows: int = GROUND_TRUTH_CHUNK_ROWS,
+    num_threads: Optional[int] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    '''
+    Exact inner-product top-k (cosine for unit-norm vectors) with float32 matrix multiplies.
+
+    Documents are split into `chunk_rows` chunks scored on a thread pool (NumPy releases
+    the GIL inside BLAS and argpartition); per-chunk top-k results are merged at the end.
+    Queries are processed in blocks so the score matrix per task stays bounded.
+    Args:
+        queries: (Q, D) float query vectors
+        docs: (N, D) float document vectors
+        top_k: int, number of neighbours per query
+        chunk_rows: int, documents per task
+        num_threads: int, worker threads (default: CPU count)
+    Returns:
+        idxs: (Q, top_k) int64, best first
+        scores: (Q, top_k) float32
+    '''
+    queries = np.ascontiguousarray(queries, dtype=np.float32)
+    docs = np.asarray(docs, dtype=np.float32)
+    N = docs.shape[0]
+    k = min(top_k, N)
+
+    def score_chunk(start: int) -> Tuple[np.ndarray, np.ndarray]:
+        chunk = docs[start:start + chunk_rows]
+        kk = min(k, chunk.shape[0])
+        idx_parts, score_parts = [], []
+        for q0 in range(0, queries.shape[0], GROUND_TRUTH_QUERY_BLOCK):
+            scores = queries[q0:q0 + GROUND_TRUTH_QUERY_BLOCK] @ chunk.T
+            top = np.argpartition(-scores, kk - 1, axis=1)[:, :kk]
+            idx_parts.append(top + start)
+            score_parts.append(np.take_along_axis(scores, top, axis=1))
+        return np.concatenate(idx_parts), np.concatenate(score_parts)
+
+    with ThreadPoolExecutor(max_workers=num_threads or os.cpu_count()) as pool:
+        parts = list(pool.map(score_chunk, range(0, N, chunk_rows)))
+
+    idxs = np.concatenate([p[0] for p in parts], axis=1).astype(np.int64)
+    scores = np.concatenate([p[1] for p in parts], axis=1)
+    order = np.argsort(-scores, axis=1, kind="stable")[:, :k]
+    return np.take_along_axis(idxs, order, axis=1), np.take_along_axis(scores, order, axis=1)
+
+
+def recall_at_k(found: np.ndarray, truth: np.ndarray, k: int) -> float:
+    '''
+    Mean fraction of the true top-k neighbours present in the first k results.
+    '''
+    hits = [np.intersect1d(f[:k], t[:k]).shape[0] for f, t in zip(found, truth)]
+    return float(np.mean(hits)) / k if hits else 0.0
+
+
+def _rerank(queries: np.ndarray, docs: np.ndarray, candidates: np.ndarray, top_k: int) -> np.ndarray:
+    safe = np.where(candidates >= 0, candidates, 0)
+    scores = np.einsum("qd,qcd->qc", queries, docs[safe])
+    scores[candidates < 0] = -np.inf
+    order = np.argsort(-scores, axis=1, kind="stable")[:, :top_k]
+    return np.take_along_axis(candidates, order, axis=1)
+
+
+def _build(config: SearchConfig, docs: np.ndarray) -> Dict[str, Any]:
+    from depths.index import binary_projection, binary_quantize_batch, greedy_k_center, scalar_quantize_batch
+    from depths.index.kcenter import kcenter_inverted_lists
+
+    if config.method == "binary":
+        Q = binary_projection(docs.shape[1])
+        return {"Q": Q, "codes": binary_quantize_batch(docs, Q)}
+    if config.method == "scalar":
+        codes, row_scales = scalar_quantize_batch(docs, bits=config.bits)
+        return {"codes": codes, "row_scales": row_scales}
+    centers, labels, _ = greedy_k_center(docs, config.num_centers, num_centers=config.assignments)
+    offsets, members = kcenter_inverted_lists(labels, centers.shape[0])
+    return {"centers": centers, "offsets": offsets, "members": members}
+
+
+def _search(config: SearchConfig, built: Dict[str, Any], queries: np.ndarray, docs: np.ndarray, top_k: int) -> np.ndarray:
+    from depths.index import binary_quantize_batch, binary_vector_search, scalar_vector_search
+    from depths.index.kcenter import kcenter_vector_search
+
+    fetch = top_k * config.oversample
+    if config.method == "binary":
+        found = binary_vector_search(binary_quantize_batch(queries, built["Q"]), built["codes"], fetch)
+        found = found.astype(np.int64)
+    elif config.method == "scalar":
+        found, _ = scalar_vector_search(
+            queries, built["codes"], row_scales=built["row_scales"], top_k=fetch, bits=config.bits
+        )
+    else:
+        found, _ = kcenter_vector_search(
+            queries, docs, built["centers"], built["offsets"], built["members"], top_k, config.num_probes
+        )
+        return found
+    if config.oversample > 1:
+        found = _rerank(queries, docs, found, top_k)
+    return found[:, :top_k]
+
+
+def evaluate_search(
+    docs: np.ndarray,
+    queries: np.ndarray,
+    configs: Sequence[SearchConfig],
+    top_k: int = 10,
+    ground_truth: Optional[np.ndarray] = None,
+    repeats: int = 3,
+    num_threads: Optional[int] = None,
+    warm: bool = True,
+) -> List[Dict[str, Any]]:
+    '''
+    Measure recall@k and QPS of each search configuration against exact ground truth.
+
+    Index builds (codes, clusters) are shared between configurations with the same
+    `build_key` and timed separately from search. With `warm`, the Numba kernels are
+    loaded and run once at the data's dimension first (`depths.index.warmup`), so build
+    times exclude the one-time cache load. Each configuration searches the full query
+    batch once to warm up, then `repeats` times; QPS uses the fastest run. All three
+    methods score candidates in compiled kernels, so their QPS figures are comparable.
+    Args:
+        docs: (N, D) float document vectors (unit-normalized for cosine semantics)
+        queries: (Q, D) float query vectors
+        configs: search configurations to evaluate
+        top_k: int, k for recall@k
+        ground_truth: (Q, >= top_k) optional precomputed exact neighbours
+        repeats: int, timed search runs per configuration
+        num_threads: int, threads for the ground-truth computation
+        warm: bool, warm up the kernels before timing builds
+    Returns:
+        report: one dict per configuration with name, config, recall, qps,
+        search_seconds and build_seconds
+    '''
+    docs = np.ascontiguousarray(docs, dtype=np.float32)
+    queries = np.ascontiguousarray(queries, dtype=np.float32)
+    if ground_truth is None:
+        ground_truth, _ = exact_ground_truth(queries, docs, top_k, num_threads=num_threads)
+    if warm:
+        from .warmup import warmup
+
+        warmup(dims=(docs.shape[1],), dtypes=("float32",), num_docs=min(1024, max(docs.shape[0], 32)),
+               top_k=top_k)
+
+    builds: Dict[Tuple, Tuple[Dict[str, Any], float]] = {}
+    report = []
+    for config in configs:
+        key = config.build_key()
+        if key not in builds:
+            start = time.perf_counter()
+            built = _build(config, docs)
+            builds[key] = (built, time.perf_counter() - start)
+        built, build_seconds = builds[key]
+
+        found = _search(config, built, queries, docs, top_k)
+        best = float("inf")
+        for _ in range(max(1, repeats)):
+            start = time.perf_counter()
+            found = _search(config, built, queries, docs, top_k)
+            best = min(best, time.perf_counter() - start)
+
+        report.append({
+            "name": config.name,
+            "config": config.to_dict(),
+            f"recall@{top_k}": recall_at_k(found, ground_truth, top_k),
+            "qps": queries.shape[0] / best if best > 0 else float("inf"),
+            "search_seconds": best,
+            "build_seconds": build_seconds,
+        })
+    return report
+
+
+def synthetic_embeddings(
+    num_docs: int,
+    num_queries: int,
+    dims: int,
+    num_clusters: int = 100,
+    noise: float = 0.3,
+    seed: int = 0,
+) -> Tuple[np.ndarray, np.ndarray]:
+    '''
+    Unit-norm Gaussian-mixture documents and queries drawn from the same mixture.
+    Returns:
+        docs: (num_docs, dims) float32
+        queries: (num_queries, dims) float32
+    '''
+    rng = np.random.default_rng(seed)
+    means = rng.standard_normal((num_clusters, dims)).astype(np.float32)
+
+    def sample(n: int) -> np.ndarray:
+        x = means[rng.integers(num_clusters, size=n)] + noise * rng.standard_normal((n, dims)).astype(np.float32)
+        return x / np.linalg.norm(x, axis=1, keepdims=True)
+
+    return sample(num_docs), sample(num_queries)
+
+
+def _column_to_matrix(series) -> np.ndarray:
+    values = series.to_numpy()
+    if values.dtype == object:
+        values = np.vstack(values)
+    return np.ascontiguousarray(values, dtype=np.float32)
+
+
+def load_embeddings_delta(
+    table_path: str,
+    column: str,
+    storage_options: Optional[Dict[str, str]] = None,
+    limit: Optional[int] = None,
+) -> np.ndarray:
+    '''
+    Load an embedding column (Array or List of floats) from a Delta table via `read_delta`.
+    '''
+    from depths.io.delta import read_delta
+
+    lf = asyncio.run(read_delta(table_path, storage_options=storage_options, return_lf=True))
+    lf = lf.select(column)
+    if limit is not None:
+        lf = lf.head(limit)
+    return _column_to_matrix(lf.collect()[column])
+
+
+def load_embeddings_ipc(path: str, index, column: str, layout: str = "batch") -> np.ndarray:
+    '''
+    Load an embedding column from an IPC file written by `write_batches_stream_ipc`
+    (layout="batch") or `write_per_row_stream_ipc` (layout="row"), given its index frame.
+    '''
+    import polars as pl
+    from depths.io.arrow import read_batch_from_file, read_row_from_file
+
+    index = pl.DataFrame(index)
+    reader, key = (read_batch_from_file, "batch") if layout == "batch" else (read_row_from_file, "row")
+    frames = [reader(path, i, index) for i in index[key].to_list()]
+    return _column_to_matrix(pl.concat(frames)[column])
+
+
+def format_report(report: List[Dict[str, Any]]) -> str:
+    lines = []
+    for row in report:
+        recall_key = next(key for key in row if key.startswith("recall@"))
+        lines.append(
+            f"{row['name']:<40} {recall_key} {row[recall_key]:.4f}  qps {row['qps']:>12.1f}"
+            f"  build {row['build_seconds'] * 1e3:>10.1f} ms"
+        )
+    return "\n".join(lines)
@@ -1,5 +1,27 @@
 import numpy as np
-from numba import njit, prange
+from numba import njit, prange, types
+from numba import boolean, int16, int32, int64, float32, float64, void
+
+from depths.index import _KERNEL_LOCK
+
+# Embedding matrices may be read-only (mmapped .npy, polars/Arrow zero-copy), so every
+# float input has a writable and a read-only variant.
+FLOAT32_2D = (float32[:, ::1], types.Array(float32, 2, "C", readonly=True))
+FLOAT64_2D = (float64[:, ::1], types.Array(float64, 2, "C", readonly=True))
+
+GREEDY_K_CENTER_SIGNATURES = [
+    int16[::1](X, int64, boolean, int64) for X in FLOAT32_2D + FLOAT64_2D
+]
+ASSIGN_LABELS_SIGNATURES = [
+    int32[:, ::1](X, int16[::1], int64, boolean) for X in FLOAT32_2D + FLOAT64_2D
+]
+PROBE_SEARCH_SIGNATURES = [
+    types.Tuple((int64[:, ::1], float32[:, ::1]))(
+        queries, docs, int64[:, ::1], int64[::1], int64[::1], int64, int64
+    )
+    for queries in FLOAT32_2D
+    for docs in FLOAT32_2D
+]
 
 @njit(inline="always")
 def _sqeuclidean(a: np.ndarray, b: np.ndarray) -> float:
@@ -51,7 +73,7 @@ def _d2_unitnorm(a: np.ndarray, b: np.ndarray) -> float:
     '''
     return 2.0 - 2.0 * _dot(a, b)
 
-@njit
+@njit(GREEDY_K_CENTER_SIGNATURES, cache=True)
 def greedy_k_center_indices(X: np.ndarray, K: int, normalized: bool, start_index: int) -> np.ndarray:
     '''
     Greedily select K centers from X, maximizing the minimum distance to any point in X.
@@ -113,7 +135,7 @@ def greedy_k_center_indices(X: np.ndarray, K: int, normalized: bool, start_index
 
     return centers_idx
 
-@njit
+@njit(int64(float32[::1]), cache=True)
 def _maxpos(arr: np.ndarray) -> int:
     '''
     Small utility to find the index of the maximum value in a 1D array.
@@ -132,7 +154,7 @@ def _maxpos(arr: np.ndarray) -> int:
             p = i
     return p
 
-@njit
+@njit(void(float32[::1], int32[::1]), cache=True)
 def _insertion_sort_by_key(keys: np.ndarray, vals: np.ndarray):
     '''
     Basic insertion sort that sorts keys in ascending order
@@ -155,12 +177,12 @@ def _insertion_sort_by_key(keys: np.ndarray, vals: np.ndarray):
         keys[j + 1] = key
         vals[j + 1] = val
 
-@njit(parallel=True)
+@njit(ASSIGN_LABELS_SIGNATURES, parallel=True, cache=True)
 def assign_labels_topL(
     X: np.ndarray,         
     centers_idx: np.ndarray,  
-    L: int = 3,
-    normalized: bool = False
+    L: int,
+    normalized: bool
 ) -> np.ndarray:
     '''
     In k-center clustering, assign each point in X to the indices of the top L nearest centers.
@@ -168,8 +190,8 @@ def assign_labels_topL(
     This ensures sufficient coverage of the dataset by the selected centers.
     Args:
         X: (N, D) float32, input data points
-        centers_idx: (K,) int32, indices of selected centers in X
-        L: int, number of nearest centers to return for each point (default: 3)
+        centers_idx: (K,) int16, indices of selected centers in X
+        L: int, number of nearest centers to return for each point
         normalized: bool, whether to use unit-normalized vectors (for cosine similarity)
     Returns:
         labels_topL: (N, L) int32, indices of the top L nearest centers for each point in X.
@@ -215,4 +237,216 @@ def assign_labels_topL(
 
         labels_topL[i, :] = best_k
 
-    return labels_topL
\ No newline at end of file
+    return labels_topL
+
+ASSIGN_BLOCK_BYTES = 64 * 1024 * 1024
+BLAS_ASSIGN_MIN_CENTERS = 16
+
+def assign_labels_topL_blas(
+    X: np.ndarray,
+    centers_idx: np.ndarray,
+    L: int,
+    normalized: bool,
+    block_bytes: int = ASSIGN_BLOCK_BYTES
+) -> np.ndarray:
+    '''
+    Blocked, BLAS-backed equivalent of `assign_labels_topL` for large numbers of centers.
+
+    Point-center dot products are computed one row block at a time with `X_block @ C.T`
+    and turned into squared distances using precomputed center norms
+    (||x - c||^2 = ||x||^2 + ||c||^2 - 2 * <x, c>; the ||x||^2 term is constant per row
+    and does not change the ranking, so it is skipped). The top L centers per row are
+    selected with `argpartition` and then sorted.
+    Args:
+        X: (N, D) float32/float64, input data points
+        centers_idx: (K,) int, indices of selected centers in X
+        L: int, number of nearest centers to return for each point
+        normalized: bool, whether rows of X are unit-normalized (drops the norm term)
+        block_bytes: int, upper bound on the (rows, K) distance block plus the int64
+            index block `argpartition` allocates for it
+    Returns:
+        labels_topL: (N, L) int32, indices of the top L nearest centers for each point in X,
+        nearest first.
+    Note: Peak extra memory is about `block_bytes` (distances plus argpartition
+    indices) plus a few (rows, L) arrays, independent of N.
+    '''
+    return assign_labels_to_centers(X, np.ascontiguousarray(X[centers_idx]), L, normalized, block_bytes)
+
+def assign_labels_to_centers(
+    X: np.ndarray,
+    C: np.ndarray,
+    L: int,
+    normalized: bool,
+    block_bytes: int = ASSIGN_BLOCK_BYTES
+) -> np.ndarray:
+    '''
+    Top-L nearest rows of an explicit center matrix `C` for every row of `X`
+    (the blocked BLAS path of `assign_labels_topL_blas`, for centers that are not rows of X,
+    e.g. centers fitted on a sample).
+    Args:
+        X: (N, D) float32/float64, input data points
+        C: (K, D) float, center vectors
+        L: int, number of nearest centers to return for each point
+        normalized: bool, whether rows of X and C are unit-normalized (drops the norm term)
+        block_bytes: int, upper bound on the (rows, K) distance block plus the int64
+            index block `argpartition` allocates for it
+    Returns:
+        labels_topL: (N, L) int32, nearest first
+    '''
+    N = X.shape[0]
+    C = np.ascontiguousarray(C, dtype=X.dtype)
+    K = C.shape[0]
+    if L > K:
+        L = K
+
+    labels_topL = np.empty((N, L), dtype=np.int32)
+    if N == 0 or L <= 0:
+        return labels_topL
+
+    CT = np.ascontiguousarray(C.T)
+    c_norms = None if normalized else np.einsum("ij,ij->i", C, C)
+    # Each block row holds K distances and K int64 argpartition indices.
+    rows = max(1, int(block_bytes) // (K * (X.dtype.itemsize + np.dtype(np.int64).itemsize)))
+
+    for start in range(0, N, rows):
+        stop = min(start + rows, N)
+        d2 = X[start:stop] @ CT
+        d2 *= -2.0
+        if c_norms is not None:
+            d2 += c_norms
+
+        if L < K:
+            top = np.argpartition(d2, L - 1, axis=1)[:, :L]
+        else:
+            top = np.broadcast_to(np.arange(K), d2.shape)
+        order = np.argsort(np.take_along_axis(d2, top, axis=1), axis=1, kind="stable")
+        labels_topL[start:stop] = np.take_along_axis(top, order, axis=1)
+
+    return labels_topL
+
+def kcenter_inverted_lists(labels_topL: np.ndarray, K: int):
+    '''
+    Invert top-L center assignments into per-center member lists.
+    Args:
+        labels_topL: (N, L) int, nearest centers per point (see `assign_labels_topL`)
+        K: int, number of centers
+    Returns:
+        offsets: (K + 1,) int64, members of center c are members[offsets[c]:offsets[c + 1]]
+        members: (N * L,) int64, point indices grouped by center
+    '''
+    N, L = labels_topL.shape
+    flat = labels_topL.reshape(-1).astype(np.int64)
+    order = np.argsort(flat, kind="stable")
+    members = order // L
+    offsets = np.zeros(K + 1, dtype=np.int64)
+    np.cumsum(np.bincount(flat, minlength=K), out=offsets[1:])
+    return offsets, members
+
+# Only reassociation/contraction (to vectorize the dot products): -inf marks empty result
+# slots, so the no-infinities assumption of fastmath=True is not allowed here.
+@njit(PROBE_SEARCH_SIGNATURES, parallel=True, nogil=True, fastmath={"reassoc", "contract"}, cache=True)
+def probe_search_kernel(queries, docs, probes, offsets, members, top_k, num_blocks):
+    '''
+    Score the members of each query's probed centers and keep the top_k by inner product.
+    Queries are split into `num_blocks` blocks run in parallel. Each query gathers the
+    member ids of its probed lists and sorts them, so members shared by several probed
+    centers (L > 1 assignments) are scored once; the scratch buffer per block is sized to
+    the largest candidate list of its queries, not to N.
+    Args:
+        queries: (Q, D) float32
+        docs: (N, D) float32
+        probes: (Q, P) int64, probed center ids per query
+        offsets, members: inverted lists from `kcenter_inverted_lists`
+        top_k: int, number of results per query
+        num_blocks: int, number of parallel query blocks
+    Returns:
+        idxs: (Q, top_k) int64, best first, padded with -1
+        scores: (Q, top_k) float32, padded with -inf
+    '''
+    Q, D = queries.shape
+    P = probes.shape[1]
+    idxs = np.full((Q, top_k), -1, dtype=np.int64)
+    scores = np.full((Q, top_k), -np.inf, dtype=np.float32)
+    block = (Q + num_blocks - 1) // num_blocks
+
+    for b in prange(num_blocks):
+        lo, hi = b * block, min(Q, (b + 1) * block)
+        size = 0
+        for q in range(lo, hi):
+            count = 0
+            for p in range(P):
+                c = probes[q, p]
+                count += offsets[c + 1] - offsets[c]
+            size = max(size, count)
+        candidates = np.empty(size, dtype=np.int64)
+        best_s = np.empty(top_k, dtype=np.float32)
+        best_i = np.empty(top_k, dtype=np.int64)
+        for q in range(lo, hi):
+            count = 0
+            for p in range(P):
+                c = probes[q, p]
+                for t in range(offsets[c], offsets[c + 1]):
+                    candidates[count] = members[t]
+                    count += 1
+            unique = np.sort(candidates[:count])
+
+            best_s[:] = -np.inf
+            best_i[:] = -1
+            worst = 0
+            for t in range(count):
+                m = unique[t]
+                if t > 0 and m == unique[t - 1]:
+                    continue
+                acc = np.float32(0.0)
+                for d in range(D):
+                    acc += queries[q, d] * docs[m, d]
+                if acc > best_s[worst]:
+                    best_s[worst] = acc
+                    best_i[worst] = m
+                    for j in range(top_k):
+                        if best_s[j] < best_s[worst]:
+                            worst = j
+            order = np.argsort(-best_s)
+            for j in range(top_k):
+                idxs[q, j] = best_i[order[j]]
+                scores[q, j] = best_s[order[j]]
+    return idxs, scores
+
+def kcenter_vector_search(
+    queries: np.ndarray,
+    docs: np.ndarray,
+    centers: np.ndarray,
+    offsets: np.ndarray,
+    members: np.ndarray,
+    top_k: int,
+    num_probes: int
+):
+    '''
+    Cluster-pruned inner-product search: each query only scores the members of its
+    `num_probes` nearest centers (by inner product, i.e. unit-norm distance).
+    Probing is one matrix multiply; candidate scoring runs in `probe_search_kernel`.
+    Args:
+        queries: (Q, D) float, query vectors
+        docs: (N, D) float, document vectors
+        centers: (K, D) float, k-center centers
+        offsets, members: inverted lists from `kcenter_inverted_lists`
+        top_k: int, number of results per query
+        num_probes: int, number of nearest centers whose members are scored
+    Returns:
+        idxs: (Q, top_k) int64, best first, padded with -1
+        scores: (Q, top_k) float32, inner products, padded with -inf
+    '''
+    import numba
+
+    if top_k <= 0:
+        return np.empty((len(queries), 0), dtype=np.int64), np.empty((len(queries), 0), dtype=np.float32)
+    queries = np.ascontiguousarray(queries, dtype=np.float32)
+    docs = np.ascontiguousarray(docs, dtype=np.float32)
+    num_probes = min(num_probes, centers.shape[0])
+    probes = np.argpartition(-(queries @ np.asarray(centers, dtype=np.float32).T), num_probes - 1, axis=1)
+    probes = np.ascontiguousarray(probes[:, :num_probes], dtype=np.int64)
+    num_blocks = max(1, min(queries.shape[0], numba.get_num_threads()))
+    offsets = np.ascontiguousarray(offsets, dtype=np.int64)
+    members = np.ascontiguousarray(members, dtype=np.int64)
+    with _KERNEL_LOCK:
+        return probe_search_kernel(queries, docs, probes, offsets, members, int(top_k), int(num_blocks))
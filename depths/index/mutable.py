@@ -0,0 +1,363 @@
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from depths import metrics
+from depths.index import _KERNEL_LOCK, binary_projection, binary_quantize_batch, greedy_k_center
+from depths.index.binary import binary_search_kernel_masked, merge_topk
+from depths.index.cache import SearchCache
+
+SEGMENT_CAPACITY = 65536
+MERGE_MIN_SEGMENTS = 4
+MERGE_MAX_DELETED_RATIO = 0.2
+MERGE_INTERVAL = 1.0
+
+
+class _Segment:
+    '''
+    Growable block of packed binary codes with a packed uint64 tombstone bitmap.
+
+    Rows are only ever appended (capacity doubles when full) and deletions only set
+    tombstone bits, so a search can work on views taken at any point in time.
+    '''
+    def __init__(self, words: int, capacity: int, dims: Optional[int] = None):
+        capacity = max(int(capacity), 64)
+        self.codes = np.empty((capacity, words), dtype=np.uint64)
+        self.ids = np.empty(capacity, dtype=np.int64)
+        self.tombstones = np.zeros((capacity + 63) // 64, dtype=np.uint64)
+        self.vectors = None if dims is None else np.empty((capacity, dims), dtype=np.float32)
+        self.size = 0
+        self.num_deleted = 0
+        self.centers: Optional[np.ndarray] = None
+        self.labels: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_arrays(cls, codes: np.ndarray, ids: np.ndarray, vectors: Optional[np.ndarray] = None) -> "_Segment":
+        segment = cls(codes.shape[1], codes.shape[0], None if vectors is None else vectors.shape[1])
+        segment.append(codes, ids, vectors)
+        return segment
+
+    @property
+    def capacity(self) -> int:
+        return self.codes.shape[0]
+
+    def _grow(self, needed: int) -> None:
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        codes = np.empty((capacity, self.codes.shape[1]), dtype=np.uint64)
+        codes[:self.size] = self.codes[:self.size]
+        ids = np.empty(capacity, dtype=np.int64)
+        ids[:self.size] = self.ids[:self.size]
+        tombstones = np.zeros((capacity + 63) // 64, dtype=np.uint64)
+        tombstones[:self.tombstones.shape[0]] = self.tombstones
+        if self.vectors is not None:
+            vectors = np.empty((capacity, self.vectors.shape[1]), dtype=np.float32)
+            vectors[:self.size] = self.vectors[:self.size]
+            self.vectors = vectors
+        self.codes, self.ids, self.tombstones = codes, ids, tombstones
+
+    def append(self, codes: np.ndarray, ids: np.ndarray, vectors: Optional[np.ndarray] = None) -> int:
+        start, stop = self.size, self.size + codes.shape[0]
+        if stop > self.capacity:
+            self._grow(stop)
+        self.codes[start:stop] = codes
+        self.ids[start:stop] = ids
+        if self.vectors is not None:
+            self.vectors[start:stop] = vectors
+        self.size = stop
+        return start
+
+    def delete(self, pos: int) -> None:
+        self.tombstones[pos >> 6] |= np.uint64(1) << np.uint64(pos & 63)
+        self.num_deleted += 1
+
+    def deleted_mask(self, positions: np.ndarray) -> np.ndarray:
+        return ((self.tombstones[positions >> 6] >> (positions & 63).astype(np.uint64)) & np.uint64(1)).astype(bool)
+
+    def view(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        n = self.size
+        tombstones = self.tombstones[:(n + 63) // 64] if self.num_deleted else self.tombstones[:0]
+        return self.codes[:n], self.ids[:n], tombstones
+
+
+class MutableBinaryIndex:
+    '''
+    Appendable binary-code index with tombstone deletes and background segment merging.
+
+    New vectors are quantized with `binary_quantize_batch` and appended to an active
+    segment; once it reaches `segment_capacity` it is sealed and a new one is started.
+    Deletes set a bit in the owning segment's tombstone bitmap, which the search kernel
+    (`binary_search_kernel_masked`) skips. `merge` compacts all segments into one, dropping
+    deleted rows and optionally re-clustering the survivors with `greedy_k_center`; it does
+    the heavy work outside the index lock, so searches keep running while it is in progress.
+    The parallel kernels themselves are launched one at a time (`_KERNEL_LOCK`), which keeps
+    concurrent use safe under any Numba threading layer.
+
+    Args:
+        dims: int, dimension D of the input vectors
+        Q: (D, D) np.ndarray, optional projection matrix (defaults to `binary_projection(dims)`)
+        segment_capacity: int, rows per active segment before it is sealed
+        keep_vectors: bool, keep float vectors alongside the codes (required for re-clustering)
+        num_clusters: int, if > 0 and keep_vectors, re-cluster on every merge with this many centers
+        normalized: bool, whether input vectors are L2-normalized (passed to `greedy_k_center`)
+        merge_min_segments: int, background merge triggers at this many segments
+        merge_max_deleted_ratio: float, ... or when this fraction of rows is deleted
+        cache: SearchCache, optional result cache consulted by `search_codes`; it is
+            invalidated through `version`, which every add/delete bumps
+    '''
+    def __init__(
+        self,
+        dims: int,
+        Q: Optional[np.ndarray] = None,
+        segment_capacity: int = SEGMENT_CAPACITY,
+        keep_vectors: bool = False,
+        num_clusters: int = 0,
+        normalized: bool = True,
+        merge_min_segments: int = MERGE_MIN_SEGMENTS,
+        merge_max_deleted_ratio: float = MERGE_MAX_DELETED_RATIO,
+        cache: Optional[SearchCache] = None,
+    ):
+        self.dims = int(dims)
+        self.Q = binary_projection(self.dims) if Q is None else np.ascontiguousarray(Q, dtype=np.float32)
+        self.words = (self.dims + 63) // 64
+        self.segment_capacity = int(segment_capacity)
+        self.keep_vectors = keep_vectors
+        self.num_clusters = int(num_clusters)
+        self.normalized = normalized
+        self.merge_min_segments = merge_min_segments
+        self.merge_max_deleted_ratio = merge_max_deleted_ratio
+        self.cache = cache
+        self.version = 0
+
+        self._lock = threading.RLock()
+        self._merge_lock = threading.Lock()
+        self._sealed: List[_Segment] = []
+        self._active = self._new_segment()
+        self._locations: Dict[int, Tuple[_Segment, int]] = {}
+        self._next_id = 0
+
+        self._merge_thread: Optional[threading.Thread] = None
+        self._merge_stop = threading.Event()
+
+    def _new_segment(self) -> _Segment:
+        return _Segment(self.words, min(self.segment_capacity, 1024), self.dims if self.keep_vectors else None)
+
+    def _segments(self) -> List[_Segment]:
+        return [*self._sealed, self._active]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._locations)
+
+    @property
+    def num_segments(self) -> int:
+        with self._lock:
+            return len(self._sealed) + (1 if self._active.size else 0)
+
+    @property
+    def clusters(self) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        '''
+        (centers, labels, ids) from the last re-clustering merge, or None.
+        Rows of `labels` line up with `ids` (the live ids at merge time).
+        '''
+        with self._lock:
+            for segment in self._sealed:
+                if segment.centers is not None:
+                    return segment.centers, segment.labels, segment.ids[:segment.size]
+        return None
+
+    def add(self, vectors: np.ndarray, ids: Optional[np.ndarray] = None) -> np.ndarray:
+        '''
+        Quantize and append vectors. Existing ids are replaced (the old row is tombstoned);
+        an id repeated within `ids` keeps only its last occurrence, like a later upsert.
+        Args:
+            vectors: (N, D) np.ndarray, input vectors
+            ids: (N,) optional int64 ids; auto-assigned when omitted
+        Returns:
+            ids: np.int64, ids of the added rows (in input order, duplicates dropped)
+        '''
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if ids is not None:
+            ids = np.asarray(ids, dtype=np.int64)
+            _, last = np.unique(ids[::-1], return_index=True)
+            if last.shape[0] < ids.shape[0]:
+                keep = np.sort(ids.shape[0] - 1 - last)
+                ids, vectors = ids[keep], vectors[keep]
+        codes = binary_quantize_batch(vectors, self.Q)
+
+        with self._lock:
+            if ids is None:
+                ids = np.arange(self._next_id, self._next_id + vectors.shape[0], dtype=np.int64)
+            else:
+                self._delete_locked(ids)
+            if ids.shape[0]:
+                self._next_id = max(self._next_id, int(ids.max()) + 1)
+
+            done = 0
+            while done < ids.shape[0]:
+                room = self.segment_capacity - self._active.size
+                if room <= 0:
+                    self._sealed.append(self._active)
+                    self._active = self._new_segment()
+                    continue
+                stop = min(done + room, ids.shape[0])
+                start = self._active.append(
+                    codes[done:stop], ids[done:stop], vectors[done:stop] if self.keep_vectors else None
+                )
+                for offset, doc_id in enumerate(ids[done:stop].tolist()):
+                    self._locations[doc_id] = (self._active, start + offset)
+                done = stop
+            self.version += 1
+        return ids
+
+    def _delete_locked(self, ids: np.ndarray) -> int:
+        deleted = 0
+        for doc_id in np.asarray(ids, dtype=np.int64).tolist():
+            location = self._locations.pop(doc_id, None)
+            if location is not None:
+                segment, pos = location
+                segment.delete(pos)
+                deleted += 1
+        if deleted:
+            self.version += 1
+        return deleted
+
+    def delete(self, ids: np.ndarray) -> int:
+        '''
+        Tombstone the rows with the given ids. Unknown ids are ignored.
+        Returns:
+            deleted: int, number of rows deleted
+        '''
+        with self._lock:
+            return self._delete_locked(ids)
+
+    def search_codes(self, queries: np.ndarray, top_k: int = 10) -> Tuple[np.ndarray, np.ndarray]:
+        '''
+        Top-k Hamming search of packed query codes over all live rows.
+        Args:
+            queries: (Q, W) np.uint64, packed query codes
+            top_k: int, number of results per query
+        Returns:
+            ids: (Q, top_k) np.int64, ids of the closest rows (-1 when fewer are live)
+            distances: (Q, top_k) np.int16, Hamming distances
+        '''
+        queries = np.ascontiguousarray(queries, dtype=np.uint64)
+        metrics.inc("depths_search_queries_total", queries.shape[0], kind="mutable")
+        with metrics.timed("depths_search_seconds", kind="mutable"):
+            if self.cache is not None:
+                return self.cache.search(queries, top_k, self._search_codes, self.version)
+            return self._search_codes(queries, top_k)
+
+    def _search_codes(self, queries: np.ndarray, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        with self._lock:
+            views = [segment.view() for segment in self._segments() if segment.size]
+
+        all_ids = [np.full((queries.shape[0], 0), -1, dtype=np.int64)]
+        all_dists = [np.empty((queries.shape[0], 0), dtype=np.int16)]
+        for codes, ids, tombstones in views:
+            k = min(top_k, codes.shape[0])
+            with _KERNEL_LOCK:
+                idxs, dists = binary_search_kernel_masked(codes, queries, int(k), tombstones)
+            all_ids.append(np.where(idxs >= 0, ids[idxs], -1))
+            all_dists.append(dists)
+
+        return merge_topk(all_ids, all_dists, top_k)
+
+    def search(self, vectors: np.ndarray, top_k: int = 10) -> Tuple[np.ndarray, np.ndarray]:
+        '''
+        Quantize float query vectors with the index projection and run `search_codes`.
+        '''
+        return self.search_codes(binary_quantize_batch(np.asarray(vectors, dtype=np.float32), self.Q), top_k)
+
+    def needs_merge(self) -> bool:
+        with self._lock:
+            segments = [segment for segment in self._segments() if segment.size]
+            total = sum(segment.size for segment in segments)
+            deleted = sum(segment.num_deleted for segment in segments)
+            return len(segments) >= self.merge_min_segments or (
+                total > 0 and deleted / total >= self.merge_max_deleted_ratio
+            )
+
+    def merge(self, recluster: Optional[bool] = None) -> None:
+        '''
+        Compact all current segments into one sealed segment without deleted rows.
+
+        The active segment is sealed first; rows added while the merge runs go to a new
+        active segment and are left alone. Deletes that land on the merged rows in the
+        meantime are carried over before the new segment is swapped in.
+        Args:
+            recluster: bool, re-run `greedy_k_center` on the merged vectors
+                (defaults to keep_vectors and num_clusters > 0)
+        '''
+        if recluster is None:
+            recluster = self.keep_vectors and self.num_clusters > 0
+        if recluster and not self.keep_vectors:
+            raise ValueError("Re-clustering requires keep_vectors=True")
+
+        with self._merge_lock:
+            with self._lock:
+                if self._active.size:
+                    self._sealed.append(self._active)
+                    self._active = self._new_segment()
+                segments = list(self._sealed)
+                origins = []
+                for segment in segments:
+                    positions = np.arange(segment.size, dtype=np.int64)
+                    origins.append((segment, positions[~segment.deleted_mask(positions)]))
+            if not segments:
+                return
+
+            codes = np.concatenate([segment.codes[pos] for segment, pos in origins])
+            ids = np.concatenate([segment.ids[pos] for segment, pos in origins])
+            vectors = None
+            if self.keep_vectors:
+                vectors = np.concatenate([segment.vectors[pos] for segment, pos in origins])
+            merged = _Segment.from_arrays(codes, ids, vectors)
+            if recluster and merged.size:
+                centers, labels, _ = greedy_k_center(
+                    vectors, min(self.num_clusters, merged.size), normalized=self.normalized
+                )
+                merged.centers, merged.labels = centers, labels
+            locations = dict(zip(ids.tolist(), ((merged, pos) for pos in range(merged.size))))
+
+            with self._lock:
+                offset = 0
+                for segment, pos in origins:
+                    for dead in np.flatnonzero(segment.deleted_mask(pos)).tolist():
+                        merged.delete(offset + dead)
+                        del locations[int(merged.ids[offset + dead])]
+                    offset += pos.shape[0]
+                self._locations.update(locations)
+                kept = [segment for segment in self._sealed if segment not in segments]
+                self._sealed = [merged, *kept] if merged.size else kept
+
+    def start_background_merge(self, interval: float = MERGE_INTERVAL) -> None:
+        '''
+        Start a daemon thread that calls `merge` whenever `needs_merge` is true,
+        checking every `interval` seconds.
+        '''
+        if self._merge_thread is not None and self._merge_thread.is_alive():
+            return
+        self._merge_stop.clear()
+
+        def loop():
+            while not self._merge_stop.wait(interval):
+                if self.needs_merge():
+                    self.merge()
+
+        self._merge_thread = threading.Thread(target=loop, name="depths-index-merge", daemon=True)
+        self._merge_thread.start()
+
+    def stop_background_merge(self) -> None:
+        self._merge_stop.set()
+        if self._merge_thread is not None:
+            self._merge_thread.join()
+            self._merge_thread = None
+
+    def __enter__(self) -> "MutableBinaryIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop_background_merge()
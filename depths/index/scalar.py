@@ -0,0 +1,294 @@
+from numba import njit, prange, types
+from numba import int8, uint8, float32
+import numpy as np
+from typing import Optional, Tuple
+
+from depths.index import _KERNEL_LOCK
+
+# Codes and row scales may be read-only (mmapped .npy, IPC/Delta zero-copy reads).
+ROW_SCALES_1D = (float32[::1], types.Array(float32, 1, "C", readonly=True))
+INT8_DOT_SIGNATURES = [
+    float32[:, ::1](codes, float32[:, ::1], row_scales)
+    for codes in (int8[:, ::1], types.Array(int8, 2, "C", readonly=True))
+    for row_scales in ROW_SCALES_1D
+]
+INT4_DOT_SIGNATURES = [
+    float32[:, ::1](codes, float32[:, ::1], row_scales)
+    for codes in (uint8[:, ::1], types.Array(uint8, 2, "C", readonly=True))
+    for row_scales in ROW_SCALES_1D
+]
+SCALAR_BITS = (8, 4)
+SEARCH_BLOCK_ROWS = 65536
+
+def qmax_for_bits(bits: int) -> int:
+    '''
+    Largest representable magnitude for symmetric `bits`-bit codes (127 for int8, 7 for int4).
+    '''
+    if bits not in SCALAR_BITS:
+        raise ValueError(f"bits must be one of {SCALAR_BITS}, got {bits}")
+    return (1 << (bits - 1)) - 1
+
+def check_search_inputs(
+    queries: np.ndarray,
+    codes: np.ndarray,
+    scales: Optional[np.ndarray],
+    row_scales: Optional[np.ndarray],
+    bits: int
+) -> None:
+    '''
+    Validate shapes and dtypes for `scalar_vector_search`; the kernels index queries up to
+    the code width without bounds checks, so mismatches must be caught up front.
+    Raises:
+        ValueError: on a dtype, width or length mismatch
+    '''
+    expected = np.int8 if bits == 8 else np.uint8
+    if codes.ndim != 2 or codes.dtype != expected:
+        raise ValueError(f"Expected (N, W) {np.dtype(expected)} codes for bits={bits}, "
+                         f"got {codes.ndim}-d {codes.dtype}")
+    if queries.ndim != 2:
+        raise ValueError(f"Expected (Q, D) queries, got {queries.ndim}-d")
+    dims = queries.shape[1]
+    width = dims if bits == 8 else (dims + 1) // 2
+    if width != codes.shape[1]:
+        raise ValueError(f"Queries with {dims} dims do not match int{bits} codes of width {codes.shape[1]}")
+    if scales is not None and np.shape(scales) != (dims,):
+        raise ValueError(f"Expected scales of shape ({dims},), got {np.shape(scales)}")
+    if row_scales is not None and np.shape(row_scales) != (codes.shape[0],):
+        raise ValueError(f"Expected row_scales of shape ({codes.shape[0]},), got {np.shape(row_scales)}")
+
+def fit_scalar_scales(sample: np.ndarray, bits: int = 8, percentile: float = 100.0) -> np.ndarray:
+    '''
+    Learn per-dimension quantization scales from a sample of vectors.
+
+    The scale of dimension d is the `percentile` of |x_d| over the sample divided by the
+    largest code value, so that dimension maps onto [-qmax, qmax]. Values beyond it are clipped.
+    Args:
+        sample: (N, D) np.ndarray, representative vectors
+        bits: int, code width (8 or 4)
+        percentile: float, percentile of |x| used as the clipping range (100 = max)
+    Returns:
+        scales: (D,) float32, per-dimension scales
+    '''
+    qmax = qmax_for_bits(bits)
+    sample = np.asarray(sample, dtype=np.float32)
+    if percentile >= 100.0:
+        bound = np.abs(sample).max(axis=0)
+    else:
+        bound = np.percentile(np.abs(sample), percentile, axis=0)
+    scales = (bound / qmax).astype(np.float32)
+    scales[scales == 0] = 1.0
+    return scales
+
+def quantize_scalar(vectors: np.ndarray, scales: np.ndarray, bits: int = 8) -> np.ndarray:
+    '''
+    Quantize vectors with given scales to signed integer codes.
+    Args:
+        vectors: (N, D) np.ndarray, input vectors
+        scales: (D,) per-dimension or (N, 1) per-vector float32 scales (broadcast against vectors)
+        bits: int, code width (8 or 4)
+    Returns:
+        codes: (N, D) int8 for bits=8, (N, ceil(D/2)) uint8 with two packed nibbles for bits=4
+    '''
+    qmax = qmax_for_bits(bits)
+    codes = np.rint(np.asarray(vectors, dtype=np.float32) / scales)
+    np.clip(codes, -qmax, qmax, out=codes)
+    codes = codes.astype(np.int8)
+    return codes if bits == 8 else pack_int4(codes)
+
+def pack_int4(codes: np.ndarray) -> np.ndarray:
+    '''
+    Pack int8 codes in [-8, 7] two per byte (offset by 8; low nibble = even dimension).
+    Odd dimensions are padded with a zero code.
+    Args:
+        codes: (N, D) int8
+    Returns:
+        packed: (N, ceil(D/2)) uint8
+    '''
+    n, d = codes.shape
+    nibbles = np.full((n, d + (d & 1)), 8, dtype=np.uint8)
+    nibbles[:, :d] = (codes.astype(np.int16) + 8).astype(np.uint8)
+    return np.ascontiguousarray(nibbles[:, 0::2] | (nibbles[:, 1::2] << 4))
+
+def unpack_int4(packed: np.ndarray, dims: int) -> np.ndarray:
+    '''
+    Inverse of `pack_int4`.
+    Args:
+        packed: (N, W) uint8
+        dims: int, original dimension D (<= 2 * W)
+    Returns:
+        codes: (N, D) int8
+    '''
+    n, w = packed.shape
+    codes = np.empty((n, 2 * w), dtype=np.int8)
+    codes[:, 0::2] = (packed & 0x0F).astype(np.int8) - 8
+    codes[:, 1::2] = (packed >> 4).astype(np.int8) - 8
+    return codes[:, :dims]
+
+@njit(INT8_DOT_SIGNATURES, parallel=True, nogil=True, fastmath=True, cache=True)
+def int8_dot_kernel(codes, queries, row_scales):
+    '''
+    Dot products between float queries and int8 codes.
+
+    Per-dimension scales are expected to be folded into the queries beforehand
+    (q_d * scale_d), so that score = row_scale_i * sum_d q_d * code_id.
+    Args:
+        codes: (N, D) int8, quantized documents
+        queries: (Q, D) float32, queries with per-dimension scales folded in
+        row_scales: (N,) float32 per-vector scales, or empty for none
+    Returns:
+        scores: (Q, N) float32
+    '''
+    Q, N, D = queries.shape[0], codes.shape[0], codes.shape[1]
+    has_row_scales = row_scales.shape[0] > 0
+    scores = np.empty((Q, N), dtype=np.float32)
+    for i in prange(N):
+        for j in range(Q):
+            s = np.float32(0.0)
+            for d in range(D):
+                s += queries[j, d] * np.float32(codes[i, d])
+            if has_row_scales:
+                s *= row_scales[i]
+            scores[j, i] = s
+    return scores
+
+@njit(INT4_DOT_SIGNATURES, parallel=True, nogil=True, fastmath=True, cache=True)
+def int4_dot_kernel(codes, queries, row_scales):
+    '''
+    Same as `int8_dot_kernel` for packed 4-bit codes (see `pack_int4`).
+    Args:
+        codes: (N, W) uint8, two offset-by-8 nibbles per byte
+        queries: (Q, 2 * W) float32, queries with per-dimension scales folded in (zero padded)
+        row_scales: (N,) float32 per-vector scales, or empty for none
+    Returns:
+        scores: (Q, N) float32
+    '''
+    Q, N, W = queries.shape[0], codes.shape[0], codes.shape[1]
+    has_row_scales = row_scales.shape[0] > 0
+    scores = np.empty((Q, N), dtype=np.float32)
+    for i in prange(N):
+        for j in range(Q):
+            s = np.float32(0.0)
+            for w in range(W):
+                b = np.int32(codes[i, w])
+                s += queries[j, 2 * w] * np.float32((b & 15) - 8)
+                s += queries[j, 2 * w + 1] * np.float32((b >> 4) - 8)
+            if has_row_scales:
+                s *= row_scales[i]
+            scores[j, i] = s
+    return scores
+
+def scalar_topk(
+    codes: np.ndarray,
+    queries: np.ndarray,
+    row_scales: np.ndarray,
+    k: int,
+    bits: int = 8,
+    block_rows: int = SEARCH_BLOCK_ROWS
+) -> Tuple[np.ndarray, np.ndarray]:
+    '''
+    Blocked top-k (highest score first) over scalar codes.
+
+    Scores are computed for `block_rows` documents at a time with the Numba dot kernels,
+    and the running top-k is merged with `argpartition`, so memory stays at O(Q * block_rows).
+    Args:
+        codes: (N, D) int8 or (N, W) uint8 packed int4 codes
+        queries: (Q, D') float32, prepared queries (scales folded in, padded for int4)
+        row_scales: (N,) float32 or empty
+        k: int, number of results per query (<= N)
+        bits: int, code width (8 or 4)
+        block_rows: int, documents scored per kernel call
+    Returns:
+        idxs: (Q, k) int64, document indices, best first
+        scores: (Q, k) float32, approximate inner products
+    '''
+    kernel = int8_dot_kernel if bits == 8 else int4_dot_kernel
+    N, Q = codes.shape[0], queries.shape[0]
+    best_idx = np.empty((Q, 0), dtype=np.int64)
+    best_scores = np.empty((Q, 0), dtype=np.float32)
+
+    for start in range(0, N, block_rows):
+        stop = min(start + block_rows, N)
+        block_scales = row_scales[start:stop] if row_scales.shape[0] else row_scales
+        with _KERNEL_LOCK:
+            block = kernel(codes[start:stop], queries, block_scales)
+        cand_scores = np.concatenate([best_scores, block], axis=1)
+        cand_idx = np.concatenate(
+            [best_idx, np.broadcast_to(np.arange(start, stop, dtype=np.int64), block.shape)], axis=1
+        )
+        if cand_scores.shape[1] > k:
+            top = np.argpartition(-cand_scores, k - 1, axis=1)[:, :k]
+            cand_scores = np.take_along_axis(cand_scores, top, axis=1)
+            cand_idx = np.take_along_axis(cand_idx, top, axis=1)
+        best_scores, best_idx = cand_scores, cand_idx
+
+    order = np.argsort(-best_scores, axis=1, kind="stable")
+    return np.take_along_axis(best_idx, order, axis=1), np.take_along_axis(best_scores, order, axis=1)
+
+def scalar_codes_to_frame(
+    codes: np.ndarray,
+    row_scales: Optional[np.ndarray] = None,
+    ids: Optional[np.ndarray] = None,
+    codes_column: str = "codes",
+    scale_column: str = "scale",
+    id_column: str = "id",
+    bits_column: str = "bits",
+):
+    '''
+    Wrap scalar codes in a Polars DataFrame (fixed-width Array column) so they can be
+    persisted with `depths.io.arrow` IPC writers or `depths.io.delta.create_delta`.
+
+    Delta has no unsigned integers, so packed int4 codes are stored bit-for-bit as Int8
+    and the code width is recorded per row in `bits_column`.
+    Args:
+        codes: (N, W) int8 codes, or uint8 packed int4 codes
+        row_scales: optional (N,) per-vector scales
+        ids: optional (N,) document ids
+    Returns:
+        df: pl.DataFrame with `codes_column`, `bits_column` (+ `scale_column`, `id_column` if given)
+    '''
+    import polars as pl
+
+    codes = np.ascontiguousarray(codes)
+    if codes.dtype not in (np.int8, np.uint8):
+        raise ValueError(f"Expected int8 or uint8 codes, got {codes.dtype}")
+    bits = 8 if codes.dtype == np.int8 else 4
+    columns = {}
+    if ids is not None:
+        columns[id_column] = ids
+    columns[codes_column] = pl.Series(codes_column, codes.view(np.int8))
+    columns[bits_column] = pl.Series(bits_column, np.full(codes.shape[0], bits, dtype=np.int8))
+    if row_scales is not None:
+        columns[scale_column] = np.asarray(row_scales, dtype=np.float32)
+    return pl.DataFrame(columns)
+
+def scalar_codes_from_frame(
+    df,
+    codes_column: str = "codes",
+    scale_column: str = "scale",
+    bits_column: str = "bits",
+) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    '''
+    Inverse of `scalar_codes_to_frame`. Accepts the fixed-width Array column it writes as
+    well as the variable-length List column a Delta round trip returns.
+    Returns:
+        codes: (N, W) int8 codes, or uint8 packed int4 codes when `bits_column` says 4
+        row_scales: (N,) float32 or None if the frame has no `scale_column`
+    Raises:
+        ValueError: if the rows of a List column have different lengths
+    '''
+    import polars as pl
+
+    series = df[codes_column]
+    if isinstance(series.dtype, pl.List):
+        lengths = series.list.len()
+        width = int(lengths[0]) if len(series) else 0
+        if len(series) and (lengths != width).any():
+            raise ValueError(f"Rows of {codes_column!r} have different code widths")
+        series = series.cast(pl.Array(series.dtype.inner, width))
+    codes = np.ascontiguousarray(series.to_numpy())
+    if bits_column in df.columns and len(df) and df[bits_column][0] == 4:
+        codes = codes.view(np.uint8)
+    row_scales = None
+    if scale_column in df.columns:
+        row_scales = np.ascontiguousarray(df[scale_column].to_numpy(), dtype=np.float32)
+    return codes, row_scales
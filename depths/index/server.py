@@ -0,0 +1,378 @@
+import json
+import multiprocessing
+import os
+import queue
+import socket
+import socketserver
+import struct
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from depths import metrics
+from depths.index.cache import SearchCache
+
+MAX_BATCH = 256
+MAX_WAIT = 0.002
+_HEADER = struct.Struct(">I")
+
+
+def save_codes(path: str, codes: np.ndarray) -> None:
+    '''
+    Persist packed binary codes as a .npy file that `SearchService` workers can memory-map.
+    '''
+    np.save(path, np.ascontiguousarray(codes, dtype=np.uint64))
+
+
+def _shard_worker(codes_path: str, lo: int, hi: int, num_threads: int, conn) -> None:
+    '''
+    Worker process body: serve top-k requests for rows [lo, hi) of the shared code matrix.
+
+    The matrix is opened with `mmap_mode="r"`, so all workers share the same read-only
+    page-cache mapping instead of each holding a private copy.
+    '''
+    try:
+        import numba
+        from depths.index.binary import binary_search_kernel_masked
+
+        numba.set_num_threads(max(1, min(num_threads, numba.config.NUMBA_NUM_THREADS)))
+        codes = np.load(codes_path, mmap_mode="r")[lo:hi]
+        no_tombstones = np.empty(0, dtype=np.uint64)
+        conn.send(("ready", hi - lo))
+    except Exception as e:
+        conn.send(("error", repr(e)))
+        return
+
+    while True:
+        message = conn.recv()
+        if message is None:
+            break
+        queries, k = message
+        try:
+            k = min(k, codes.shape[0])
+            idxs, dists = binary_search_kernel_masked(codes, queries, int(k), no_tombstones)
+            conn.send(("ok", (np.where(idxs >= 0, idxs.astype(np.int64) + lo, -1), dists)))
+        except Exception as e:
+            conn.send(("error", repr(e)))
+
+
+class _Request:
+    def __init__(self, queries: np.ndarray, top_k: int):
+        self.queries = queries
+        self.top_k = top_k
+        self.future: Future = Future()
+
+
+class SearchService:
+    '''
+    Sharded multi-process binary search over a shared, memory-mapped code matrix.
+
+    The (N, W) uint64 code matrix stored at `codes_path` (see `save_codes`) is split into
+    `num_shards` contiguous row ranges, each served by a worker process that maps the file
+    read-only. Incoming requests are micro-batched: a dispatcher thread collects concurrent
+    requests for up to `max_wait` seconds (or `max_batch` query rows), fans the stacked
+    queries out to every shard in a single kernel call per shard and merges the per-shard
+    top-k results with `merge_topk`.
+
+    Args:
+        codes_path: str, path to a .npy file of packed uint64 codes
+        num_shards: int, number of worker processes (default: CPU count)
+        max_batch: int, maximum query rows per dispatched batch
+        max_wait: float, seconds to wait for more requests before dispatching a batch
+        start_method: str, multiprocessing start method for the workers
+        cache: SearchCache, optional result cache in front of `search` (the code matrix is
+            read-only, so its version never changes)
+    '''
+    def __init__(
+        self,
+        codes_path: str,
+        num_shards: Optional[int] = None,
+        max_batch: int = MAX_BATCH,
+        max_wait: float = MAX_WAIT,
+        start_method: str = "spawn",
+        cache: Optional[SearchCache] = None,
+    ):
+        self.codes_path = codes_path
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.cache = cache
+
+        shape = np.load(codes_path, mmap_mode="r").shape
+        self.num_docs, self.words = shape
+        cpus = os.cpu_count() or 1
+        num_shards = max(1, min(num_shards or cpus, self.num_docs or 1))
+        bounds = np.linspace(0, self.num_docs, num_shards + 1).astype(np.int64)
+        self.shards: List[Tuple[int, int]] = list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+
+        self.stats: Dict[str, int] = {"requests": 0, "queries": 0, "batches": 0}
+        self._requests: "queue.Queue[Optional[_Request]]" = queue.Queue()
+        self._closed = False
+        self._close_lock = threading.Lock()
+        self._conns = []
+        self._processes = []
+
+        ctx = multiprocessing.get_context(start_method)
+        threads_per_shard = max(1, cpus // num_shards)
+        for lo, hi in self.shards:
+            parent, child = ctx.Pipe()
+            process = ctx.Process(
+                target=_shard_worker,
+                args=(codes_path, lo, hi, threads_per_shard, child),
+                name=f"depths-shard-{lo}-{hi}",
+                daemon=True,
+            )
+            process.start()
+            child.close()
+            self._conns.append(parent)
+            self._processes.append(process)
+
+        for conn in self._conns:
+            status, payload = conn.recv()
+            if status != "ready":
+                self.close()
+                raise RuntimeError(f"Search shard failed to start: {payload}")
+
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name="depths-search-dispatch", daemon=True)
+        self._dispatcher.start()
+
+    def submit(self, queries: np.ndarray, top_k: int = 10) -> Future:
+        '''
+        Enqueue a search and return a Future resolving to (ids, distances).
+        Raises RuntimeError once the service is closed.
+        '''
+        queries = np.ascontiguousarray(np.atleast_2d(queries), dtype=np.uint64)
+        if queries.shape[1] != self.words:
+            raise ValueError(f"Expected queries with {self.words} words, got {queries.shape[1]}")
+        request = _Request(queries, int(top_k))
+        with self._close_lock:
+            if self._closed:
+                raise RuntimeError("service closed")
+            self._requests.put(request)
+        return request.future
+
+    def search(self, queries: np.ndarray, top_k: int = 10) -> Tuple[np.ndarray, np.ndarray]:
+        '''
+        Top-k Hamming search of packed query codes across all shards.
+        Args:
+            queries: (Q, W) np.uint64, packed query codes
+            top_k: int, number of results per query
+        Returns:
+            ids: (Q, top_k) np.int64, row indices into the code matrix
+            distances: (Q, top_k) np.int16, Hamming distances
+        '''
+        if self.cache is not None:
+            queries = np.ascontiguousarray(np.atleast_2d(queries), dtype=np.uint64)
+            return self.cache.search(queries, top_k, lambda q, k: self.submit(q, k).result(), version=0)
+        return self.submit(queries, top_k).result()
+
+    def _dispatch_loop(self) -> None:
+        stopping = False
+        while not stopping:
+            request = self._requests.get()
+            if request is None:
+                break
+            batch = [request]
+            rows = request.queries.shape[0]
+            deadline = time.monotonic() + self.max_wait
+            while rows < self.max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    request = self._requests.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if request is None:
+                    stopping = True
+                    break
+                batch.append(request)
+                rows += request.queries.shape[0]
+            self._run_batch(batch)
+
+    def _run_batch(self, batch: List[_Request]) -> None:
+        from depths.index.binary import merge_topk
+
+        queries = np.concatenate([request.queries for request in batch])
+        top_k = max(request.top_k for request in batch)
+        try:
+            with metrics.timed("depths_search_seconds", kind="service"):
+                for conn in self._conns:
+                    conn.send((queries, top_k))
+                replies = [conn.recv() for conn in self._conns]
+                errors = [payload for status, payload in replies if status != "ok"]
+                if errors:
+                    raise RuntimeError(f"Search shard failed: {errors[0]}")
+                ids, dists = merge_topk(
+                    [payload[0] for _, payload in replies],
+                    [payload[1] for _, payload in replies],
+                    top_k,
+                )
+        except Exception as e:
+            for request in batch:
+                request.future.set_exception(e)
+            return
+
+        self.stats["batches"] += 1
+        self.stats["requests"] += len(batch)
+        self.stats["queries"] += queries.shape[0]
+        metrics.inc("depths_search_batches_total", kind="service")
+        metrics.inc("depths_search_queries_total", queries.shape[0], kind="service")
+        start = 0
+        for request in batch:
+            stop = start + request.queries.shape[0]
+            request.future.set_result((ids[start:stop, :request.top_k], dists[start:stop, :request.top_k]))
+            start = stop
+
+    def close(self) -> None:
+        '''
+        Stop the dispatcher and shut down the shard processes. Requests still queued
+        when the dispatcher stops fail with RuntimeError("service closed").
+        '''
+        with self._close_lock:
+            self._closed = True
+        dispatcher = getattr(self, "_dispatcher", None)
+        if dispatcher is not None and dispatcher.is_alive():
+            self._requests.put(None)
+            dispatcher.join()
+        while True:
+            try:
+                request = self._requests.get_nowait()
+            except queue.Empty:
+                break
+            if request is not None and not request.future.done():
+                request.future.set_exception(RuntimeError("service closed"))
+        for conn in self._conns:
+            try:
+                conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self._conns, self._processes = [], []
+
+    def __enter__(self) -> "SearchService":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class LocalTransport:
+    '''
+    In-process transport: calls the service directly (same interface as UnixSocketTransport).
+    '''
+    def __init__(self, service: SearchService):
+        self.service = service
+
+    def search(self, queries: np.ndarray, top_k: int = 10) -> Tuple[np.ndarray, np.ndarray]:
+        return self.service.search(queries, top_k)
+
+    def close(self) -> None:
+        pass
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    chunks = bytearray()
+    while len(chunks) < size:
+        chunk = sock.recv(size - len(chunks))
+        if not chunk:
+            raise ConnectionError("Socket closed mid-frame")
+        chunks += chunk
+    return bytes(chunks)
+
+
+def _send_frame(sock: socket.socket, header: Dict[str, Any], *arrays: np.ndarray) -> None:
+    '''
+    Frame layout: 4-byte big-endian header length, JSON header, then the raw array buffers
+    (their dtypes, shapes and byte sizes are listed in the header).
+    '''
+    header = {
+        **header,
+        "arrays": [{"dtype": a.dtype.str, "shape": list(a.shape), "nbytes": a.nbytes} for a in arrays],
+    }
+    encoded = json.dumps(header).encode()
+    sock.sendall(_HEADER.pack(len(encoded)) + encoded + b"".join(np.ascontiguousarray(a).tobytes() for a in arrays))
+
+
+def _recv_frame(sock: socket.socket) -> Tuple[Dict[str, Any], List[np.ndarray]]:
+    (length,) = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    header = json.loads(_recv_exact(sock, length))
+    arrays = []
+    for spec in header.get("arrays", []):
+        data = _recv_exact(sock, spec["nbytes"])
+        arrays.append(np.frombuffer(data, dtype=np.dtype(spec["dtype"])).reshape(spec["shape"]))
+    return header, arrays
+
+
+class _SearchRequestHandler(socketserver.BaseRequestHandler):
+    def handle(self) -> None:
+        while True:
+            try:
+                header, arrays = _recv_frame(self.request)
+            except (ConnectionError, struct.error):
+                return
+            try:
+                ids, dists = self.server.service.search(arrays[0], int(header["top_k"]))
+                _send_frame(self.request, {"status": "ok"}, ids, dists)
+            except Exception as e:
+                _send_frame(self.request, {"status": "error", "error": repr(e)})
+
+
+class UnixSocketServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    '''
+    Serve a SearchService over a Unix domain socket.
+
+    Each client connection gets its own thread; all of them feed the service's
+    micro-batcher, so concurrent clients share kernel calls.
+    '''
+    daemon_threads = True
+
+    def __init__(self, service: SearchService, path: str):
+        if os.path.exists(path):
+            os.unlink(path)
+        self.service = service
+        self.path = path
+        super().__init__(path, _SearchRequestHandler)
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "UnixSocketServer":
+        self._thread = threading.Thread(target=self.serve_forever, name="depths-search-socket", daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self) -> None:
+        if self._thread is not None:
+            self.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.server_close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+class UnixSocketTransport:
+    '''
+    Client for UnixSocketServer. One request in flight per transport; open one per
+    client thread to get concurrency.
+    '''
+    def __init__(self, path: str):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(path)
+        self._lock = threading.Lock()
+
+    def search(self, queries: np.ndarray, top_k: int = 10) -> Tuple[np.ndarray, np.ndarray]:
+        queries = np.ascontiguousarray(np.atleast_2d(queries), dtype=np.uint64)
+        with self._lock:
+            _send_frame(self.sock, {"top_k": int(top_k)}, queries)
+            header, arrays = _recv_frame(self.sock)
+        if header["status"] != "ok":
+            raise RuntimeError(f"Search failed: {header.get('error')}")
+        return arrays[0], arrays[1]
+
+    def close(self) -> None:
+        self.sock.close()
@@ -0,0 +1,134 @@
+import importlib
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+KERNEL_MODULES = ("depths.index.binary", "depths.index.kcenter", "depths.index.scalar")
+WARMUP_DIMS = (384, 768, 1536)
+WARMUP_DTYPES = ("float32", "float64")
+
+
+def _cache_stats(module) -> Dict[str, int]:
+    '''
+    Sum Numba on-disk cache hits/misses over every dispatcher in a kernel module.
+    '''
+    hits, misses = 0, 0
+    for value in vars(module).values():
+        stats = getattr(value, "stats", None)
+        if stats is None or not hasattr(stats, "cache_hits"):
+            continue
+        hits += sum(stats.cache_hits.values())
+        misses += sum(stats.cache_misses.values())
+    return {"cache_hits": hits, "cache_misses": misses}
+
+
+def _time_call(fn, *args, **kwargs) -> float:
+    start = time.perf_counter()
+    fn(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def warmup(
+    dims: Sequence[int] = WARMUP_DIMS,
+    dtypes: Sequence[str] = WARMUP_DTYPES,
+    num_docs: int = 1024,
+    num_queries: int = 16,
+    top_k: int = 10,
+    num_centers: int = 16,
+    seed: Optional[int] = 0,
+) -> List[Dict[str, Any]]:
+    '''
+    Ahead-of-time warmup for the Numba kernels in `depths.index`.
+
+    Every kernel is declared with explicit signatures and `cache=True`, so importing
+    a kernel module compiles (first run) or loads from the on-disk cache (later runs)
+    all of its specializations. This function forces that step, then runs the public
+    wrappers once per dtype/dimension combo on synthetic data so that worker processes
+    started afterwards only pay the cache load.
+
+    Args:
+        dims: embedding dimensions to exercise.
+        dtypes: float dtypes (names) to exercise for the float kernels.
+        num_docs: number of synthetic documents per combo.
+        num_queries: number of synthetic queries per combo.
+        top_k: top-k used for the search kernel.
+        num_centers: number of k-center clusters used for the clustering kernels.
+        seed: seed for the synthetic data.
+    Returns:
+        report: list of dicts, one per step. Compile steps carry `seconds` plus Numba
+        cache hit/miss counts; run steps carry `first_call_seconds` and `steady_seconds`.
+    '''
+    report: List[Dict[str, Any]] = []
+    for module_name in KERNEL_MODULES:
+        start = time.perf_counter()
+        module = importlib.import_module(module_name)
+        elapsed = time.perf_counter() - start
+        report.append({
+            "phase": "compile",
+            "target": module_name,
+            "seconds": elapsed,
+            **_cache_stats(module),
+        })
+
+    from depths.index import (
+        binary_quantize_batch,
+        binary_vector_search,
+        greedy_k_center,
+        scalar_quantize_batch,
+        scalar_vector_search,
+    )
+
+    rng = np.random.default_rng(seed)
+    for dtype in dtypes:
+        for dim in dims:
+            docs = rng.standard_normal((num_docs, dim)).astype(dtype)
+            docs /= np.linalg.norm(docs, axis=1, keepdims=True)
+            queries = docs[:num_queries]
+
+            steps = [
+                ("binary_quantize_batch", lambda: binary_quantize_batch(docs)),
+                ("greedy_k_center", lambda: greedy_k_center(docs, num_centers, dtype=dtype)),
+            ]
+            doc_codes = binary_quantize_batch(docs)
+            query_codes = doc_codes[:num_queries]
+            steps.append(("binary_vector_search", lambda: binary_vector_search(query_codes, doc_codes, top_k)))
+            for bits in (8, 4):
+                codes, row_scales = scalar_quantize_batch(docs, bits=bits)
+                steps.append((
+                    f"scalar_vector_search[int{bits}]",
+                    lambda codes=codes, row_scales=row_scales, bits=bits: scalar_vector_search(
+                        queries, codes, row_scales=row_scales, top_k=top_k, bits=bits
+                    ),
+                ))
+
+            for name, step in steps:
+                report.append({
+                    "phase": "run",
+                    "target": name,
+                    "dtype": dtype,
+                    "dims": dim,
+                    "first_call_seconds": _time_call(step),
+                    "steady_seconds": _time_call(step),
+                })
+    return report
+
+
+def format_report(report: List[Dict[str, Any]]) -> str:
+    '''
+    Render a warmup report as a plain-text table.
+    '''
+    lines = []
+    for row in report:
+        if row["phase"] == "compile":
+            lines.append(
+                f"compile  {row['target']:<40} {row['seconds'] * 1e3:>10.2f} ms"
+                f"  (cache hits={row['cache_hits']}, misses={row['cache_misses']})"
+            )
+        else:
+            label = f"{row['target']}[{row['dtype']},{row['dims']}]"
+            lines.append(
+                f"run      {label:<40} {row['first_call_seconds'] * 1e3:>10.2f} ms"
+                f"  (steady {row['steady_seconds'] * 1e3:.2f} ms)"
+            )
+    return "\n".join(lines)
@@ -0,0 +1,14 @@
+from depths._lazy import lazy_exports
+
+_EXPORTS = {
+    "create_delta": ".delta",
+    "read_delta": ".delta",
+    "create_deltas": ".delta",
+    "read_deltas": ".delta",
+    "write_per_row_stream_ipc": ".arrow",
+    "write_batches_stream_ipc": ".arrow",
+    "read_row_from_file": ".arrow",
+    "read_batch_from_file": ".arrow",
+}
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
@@ -3,6 +3,8 @@ from pyarrow import ipc
 import polars as pl
 from typing import List, Dict, Optional, Literal
 
+from depths import metrics
+
 def write_per_row_stream_ipc(
     data:pl.DataFrame,
     path: str,
@@ -11,7 +13,7 @@ def write_per_row_stream_ipc(
 )-> pl.DataFrame:
 
     index: List[Dict]=[]
-    with pa.OSFile(path,"wb") as sink:
+    with metrics.timed("depths_io_write_seconds", layout="row"), pa.OSFile(path,"wb") as sink:
         for i in range(data.height):
             row_df=data.slice(i,1)
             arrow_table=row_df.to_arrow()
@@ -30,6 +32,9 @@ def write_per_row_stream_ipc(
 
             entry={index_column_name:i,"offset":start,"length":length}
             index.append(entry)
+        written=sink.tell()
+    metrics.inc("depths_io_write_bytes_total", written, layout="row")
+    metrics.inc("depths_io_write_items_total", data.height, layout="row")
     
     if index_path:
         index=pl.DataFrame(index)
@@ -44,7 +49,7 @@ def write_batches_stream_ipc(
 )-> pl.DataFrame:
     
     index: List[Dict]=[]
-    with pa.OSFile(path,"wb") as sink:
+    with metrics.timed("depths_io_write_seconds", layout="batch"), pa.OSFile(path,"wb") as sink:
         for i in range(len(batched_data)):
             batch_df=batched_data[i]
             arrow_table=batch_df.to_arrow()
@@ -63,6 +68,9 @@ def write_batches_stream_ipc(
 
             entry={index_column_name:i,"offset":start,"length":length}
             index.append(entry)
+        written=sink.tell()
+    metrics.inc("depths_io_write_bytes_total", written, layout="batch")
+    metrics.inc("depths_io_write_items_total", len(batched_data), layout="batch")
     
     if index_path:
         index=pl.DataFrame(index)
@@ -81,9 +89,10 @@ def read_row_from_file(
         named=True
     )
 
-    with pa.OSFile(path,"rb") as source:
+    with metrics.timed("depths_io_read_seconds", layout="row"), pa.OSFile(path,"rb") as source:
         source.seek(entry["offset"])
         data=source.read(entry["length"])
+    metrics.inc("depths_io_read_bytes_total", entry["length"], layout="row")
 
     reader=ipc.open_stream(pa.BufferReader(data))
     try:
@@ -105,9 +114,10 @@ def read_batch_from_file(
         named=True
     )
 
-    with pa.OSFile(path,"rb") as source:
+    with metrics.timed("depths_io_read_seconds", layout="batch"), pa.OSFile(path,"rb") as source:
         source.seek(entry["offset"])
         data=source.read(entry["length"])
+    metrics.inc("depths_io_read_bytes_total", entry["length"], layout="batch")
 
     reader=ipc.open_stream(pa.BufferReader(data))
     try:
@@ -1,15 +1,110 @@
 import polars as pl
-from deltalake import DeltaTable
-from deltalake.exceptions import DeltaError, TableNotFoundError
 import asyncio
-from typing import Optional, List, Dict, Any, Tuple
+import functools
+import random
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Dict, Any, Tuple, Mapping, Sequence
+
+from depths import metrics
 
 NUM_RETRIES = 3
+BACKOFF_BASE = 0.1
+BACKOFF_MAX = 5.0
+DELTA_MAX_WORKERS = 8
+DELTA_MAX_CONCURRENCY = 8
 NO_HISTORY = {
     "delta.logRetentionDuration": "interval 0 days",
     "delta.deletedFileRetentionDuration": "interval 0 days",
 }
 
+# object_store surfaces network failures as a bare OSError ("Generic S3 error: ...");
+# only these messages mark one as transient. Its retry errors also print their settings
+# ("max_retries:10, retry_timeout:180s, source:..."), so only the `source:` part, the
+# underlying failure, is matched when present.
+_TRANSIENT_OS_ERROR = re.compile(
+    r"error sending request|\btimed? ?out\b|connection (?:reset|refused|closed|aborted)"
+    r"|slow ?down|throttl|too many requests|service unavailable|internal server error|bad gateway"
+    r"|\b(?:429|500|502|503|504)\b",
+    re.IGNORECASE,
+)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_workers = DELTA_MAX_WORKERS
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=_executor_workers, thread_name_prefix="depths-delta")
+        return _executor
+
+
+def set_max_workers(max_workers: int) -> None:
+    '''
+    Resize the shared thread pool that runs Delta reads and writes (default DELTA_MAX_WORKERS).
+    Calls already running on the old pool finish there.
+    '''
+    global _executor, _executor_workers
+    if max_workers < 1:
+        raise ValueError("max_workers must be at least 1")
+    with _executor_lock:
+        old, _executor, _executor_workers = _executor, None, max_workers
+    if old is not None:
+        old.shutdown(wait=False)
+
+
+async def _run_in_executor(fn, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), functools.partial(fn, *args, **kwargs))
+
+
+def _is_retriable(error: BaseException) -> bool:
+    '''
+    Commit conflicts (another writer committed the same version first), connection and
+    timeout errors, and object-store OSErrors whose message shows a transport failure,
+    throttling or a 5xx response are retried; anything else (schema mismatch, bad mode,
+    protocol errors, missing files, ...) will fail the same way again.
+    '''
+    from deltalake.exceptions import CommitFailedError
+
+    if isinstance(error, (CommitFailedError, ConnectionError, TimeoutError)):
+        return True
+    if not isinstance(error, OSError):
+        return False
+    message = str(error)
+    if "source:" in message:
+        message = message.split("source:", 1)[1]
+    return _TRANSIENT_OS_ERROR.search(message) is not None
+
+
+def _backoff(attempt: int) -> float:
+    '''
+    Full-jitter exponential backoff: uniform in [0, min(BACKOFF_MAX, BACKOFF_BASE * 2**attempt)].
+    '''
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+def _write_delta(
+    table_path: str,
+    data: pl.DataFrame,
+    mode: str,
+    storage_options: Optional[Dict[str, str]],
+    write_opts: Dict[str, Any],
+) -> None:
+    with metrics.timed("depths_delta_commit_seconds", mode=mode):
+        data.write_delta(
+            table_path,
+            mode=mode,
+            storage_options=storage_options,
+            delta_write_options=write_opts,
+        )
+    metrics.inc("depths_delta_rows_written_total", data.height, mode=mode)
+
+
 async def create_delta(
     table_path: str,
     data: pl.DataFrame,
@@ -23,20 +118,23 @@ async def create_delta(
     """Creates a Delta table with the given data.
 
     Supports both local file paths (absolute and relative paths) and S3 paths (e.g., "s3://bucket/path/to/table").
-    Retries the operation a specified number of times in case of failure.
+    The write runs on the shared Delta thread pool, so the event loop stays free and several
+    writes can proceed concurrently (see `create_deltas`). Commit conflicts and transient
+    object-store failures (connection errors, timeouts, throttling, 5xx responses) are retried
+    with jittered exponential backoff; other errors are raised immediately.
 
     Args:
         table_path: The URI path to the Delta table.
         data: The Polars DataFrame to write to the table.
         mode: The write mode ('error', 'append', 'overwrite', 'ignore').
               Defaults to 'ignore' (if table exists, do nothing).
-        num_retries: The number of times to retry the operation upon failure. Defaults to NUM_RETRIES.
+        num_retries: The maximum number of attempts for retriable failures. Defaults to NUM_RETRIES.
         storage_options: A dictionary of options for the storage backend (e.g., S3 credentials).
                          Defaults to None.
 
     Raises:
-        Exception: Re-raises the last exception if all retries fail.
-                  Could be DeltaError or other storage-related exceptions.
+        Exception: Re-raises a non-retriable exception immediately, or the last
+                  retriable one (e.g. CommitFailedError) once all attempts fail.
     """
     write_opts = dict(delta_write_options or {})
     if partition_by:
@@ -48,17 +146,14 @@ async def create_delta(
 
     for attempt in range(num_retries):
         try:
-            data.write_delta(
-                table_path,
-                mode=mode,
-                storage_options=storage_options,
-                delta_write_options=write_opts,
-            )
+            await _run_in_executor(_write_delta, table_path, data, mode, storage_options, write_opts)
             return
         except Exception as e:
-            if attempt == num_retries - 1:
+            if attempt == num_retries - 1 or not _is_retriable(e):
+                metrics.inc("depths_delta_commit_failures_total", error=type(e).__name__)
                 raise e
-            await asyncio.sleep((attempt + 1) * 0.1)
+            metrics.inc("depths_delta_commit_retries_total", error=type(e).__name__)
+            await asyncio.sleep(_backoff(attempt))
 
 
 async def read_delta(
@@ -74,7 +169,8 @@ async def read_delta(
     Supports both local file paths (tested for file:/// prefixed absolute paths and os module defined absolute paths)
     and S3 paths (e.g., "s3://bucket/path/to/table").
     
-    Retries with DeltaTable.read() if pl.scan_delta() fails.
+    Retries with DeltaTable.read() if pl.scan_delta() fails. The read runs on the shared
+    Delta thread pool, so concurrent reads (see `read_deltas`) do not block the event loop.
     
     Args:
         table_path: The path to the Delta table.
@@ -86,6 +182,21 @@ async def read_delta(
     Returns:
         A LazyFrame or DataFrame containing the Delta table data.
     '''
+    return await _run_in_executor(
+        _read_delta, table_path, storage_options, partitions, filters, return_lf
+    )
+
+
+def _read_delta(
+    table_path: str,
+    storage_options: Optional[Dict[str, str]],
+    partitions: Optional[List[Tuple[str, str, Any]]],
+    filters: Optional[Any],
+    return_lf: Optional[bool],
+):
+    from deltalake import DeltaTable
+    from deltalake.exceptions import DeltaError, TableNotFoundError
+
     try:
         pyarrow_opts = None
         if partitions or filters:
@@ -100,15 +211,82 @@ async def read_delta(
             storage_options=storage_options,
             pyarrow_options=pyarrow_opts,
         )
-        return lf if return_lf else lf.collect()
+        if return_lf:
+            return lf
+        with metrics.timed("depths_delta_read_seconds", path="scan"):
+            df = lf.collect()
+        metrics.inc("depths_delta_rows_read_total", df.height)
+        return df
 
     except (TableNotFoundError, DeltaError):
         raise ValueError("Table not found")
 
     except Exception:
         try:
-            dt = DeltaTable(table_path, storage_options=storage_options)
-            pa_tbl = dt.to_pyarrow_table(partitions=partitions, filters=filters)
+            with metrics.timed("depths_delta_read_seconds", path="fallback"):
+                dt = DeltaTable(table_path, storage_options=storage_options)
+                pa_tbl = dt.to_pyarrow_table(partitions=partitions, filters=filters)
+            metrics.inc("depths_delta_rows_read_total", pa_tbl.num_rows)
             return pl.from_arrow(pa_tbl)
         except Exception:
-            raise ValueError("Failed to read table")
\ No newline at end of file
+            raise ValueError("Failed to read table")
+
+
+async def _gather_limited(coros, max_concurrency: int, return_exceptions: bool) -> List[Any]:
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run(coro):
+        async with semaphore:
+            return await coro
+
+    return await asyncio.gather(*(run(coro) for coro in coros), return_exceptions=return_exceptions)
+
+
+async def create_deltas(
+    tables: Mapping[str, pl.DataFrame],
+    max_concurrency: int = DELTA_MAX_CONCURRENCY,
+    return_exceptions: bool = False,
+    **kwargs: Any,
+) -> List[Any]:
+    '''
+    Write many Delta tables concurrently (e.g. one table per tenant).
+
+    Args:
+        tables: Mapping of table path to the DataFrame written there.
+        max_concurrency: Maximum number of writes in flight at once.
+        return_exceptions: Return failures in the result list instead of raising the first one.
+        **kwargs: Passed to `create_delta` for every table (mode, storage_options, ...).
+
+    Returns:
+        One entry per table, in order: None on success, or the exception if return_exceptions.
+    '''
+    return await _gather_limited(
+        (create_delta(path, data, **kwargs) for path, data in tables.items()),
+        max_concurrency,
+        return_exceptions,
+    )
+
+
+async def read_deltas(
+    table_paths: Sequence[str],
+    max_concurrency: int = DELTA_MAX_CONCURRENCY,
+    return_exceptions: bool = False,
+    **kwargs: Any,
+) -> List[Any]:
+    '''
+    Read many Delta tables concurrently.
+
+    Args:
+        table_paths: The Delta table paths to read.
+        max_concurrency: Maximum number of reads in flight at once.
+        return_exceptions: Return failures in the result list instead of raising the first one.
+        **kwargs: Passed to `read_delta` for every table (storage_options, filters, return_lf, ...).
+
+    Returns:
+        One DataFrame/LazyFrame (or exception, if return_exceptions) per path, in order.
+    '''
+    return await _gather_limited(
+        (read_delta(path, **kwargs) for path in table_paths),
+        max_concurrency,
+        return_exceptions,
+    )
@@ -0,0 +1,9 @@
+from depths._lazy import lazy_exports
+
+_EXPORTS = {
+    "DepthsLogger": ".core",
+    "LLMLogsConfig": ".core",
+    "LoggedOpenAI": ".llm",
+}
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
@@ -1,7 +1,6 @@
+from depths import metrics
 from depths.logger.core import DepthsLogger
 
-from openai import OpenAI
-
 from typing import Optional, Callable, Dict, Tuple, Any
 import functools
 
@@ -29,7 +28,9 @@ def make_wrapper(original, handler, path):
     '''
     def wrapped(*args, **kwargs):
         result=original(*args, **kwargs)
-        handler(path, args, kwargs, result)
+        with metrics.timed("depths_logger_flush_seconds", method=path):
+            handler(path, args, kwargs, result)
+        metrics.inc("depths_logger_records_total", method=path)
         return result
     return wrapped
 
@@ -69,6 +70,8 @@ class LoggedOpenAI:
         return attr
 
     def __init__(self,*args,logger: Optional[DepthsLogger] = None, **kwargs):
+        from openai import OpenAI
+
         self.client=OpenAI(*args, **kwargs)
         if logger is None:
             logger=DepthsLogger()
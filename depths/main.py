@@ -1,6 +1,17 @@
-def main():
-    print("Hello from depths!")
+from typing import List, Optional
+
+from depths.cli import build_parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if getattr(args, "func", None) is None:
+        print("Hello from depths!")
+        parser.print_help()
+        return 0
+    return args.func(args)
 
 
 if __name__ == "__main__":
-    main()
+    raise SystemExit(main())
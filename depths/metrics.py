@@ -0,0 +1,236 @@
+import bisect
+import os
+import threading
+import time
+from contextlib import nullcontext
+from typing import Any, Dict, Tuple
+
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+METRICS_PORT = 9464
+
+_enabled = os.environ.get("DEPTHS_METRICS", "").lower() in ("1", "true", "yes", "on")
+_NOOP = nullcontext()
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    '''
+    Fixed-bucket histogram (Prometheus semantics: `le` upper bounds plus +Inf).
+    '''
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        '''
+        Upper bound of the bucket containing the q-quantile (inf if it falls past the last bucket).
+        '''
+        if not self.count:
+            return 0.0
+        rank, seen = q * self.count, 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class _Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self.counters: Dict[str, Dict[LabelKey, float]] = {}
+
+
+_registry = _Registry()
+
+
+def enable() -> None:
+    '''
+    Turn instrumentation on (also enabled at import with DEPTHS_METRICS=1).
+    '''
+    global _enabled
+    _enabled = True
+
+
+def disable() -> None:
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset() -> None:
+    '''
+    Drop all recorded values.
+    '''
+    with _registry.lock:
+        _registry.histograms.clear()
+        _registry.counters.clear()
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def observe(name: str, value: float, **labels: Any) -> None:
+    '''
+    Record `value` in histogram `name`. No-op while instrumentation is disabled.
+    '''
+    if not _enabled:
+        return
+    key = _label_key(labels)
+    with _registry.lock:
+        series = _registry.histograms.setdefault(name, {})
+        histogram = series.get(key)
+        if histogram is None:
+            histogram = series[key] = Histogram()
+        histogram.observe(value)
+
+
+def inc(name: str, value: float = 1, **labels: Any) -> None:
+    '''
+    Add `value` to counter `name`. No-op while instrumentation is disabled.
+    '''
+    if not _enabled:
+        return
+    key = _label_key(labels)
+    with _registry.lock:
+        series = _registry.counters.setdefault(name, {})
+        series[key] = series.get(key, 0) + value
+
+
+class _Timer:
+    __slots__ = ("name", "labels", "start")
+
+    def __init__(self, name: str, labels: Dict[str, Any]):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self) -> "_Timer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        observe(self.name, time.perf_counter() - self.start, **self.labels)
+
+
+def timed(name: str, **labels: Any):
+    '''
+    Context manager recording the elapsed seconds of its body in histogram `name`.
+    Returns a shared no-op context while instrumentation is disabled.
+    '''
+    if not _enabled:
+        return _NOOP
+    return _Timer(name, labels)
+
+
+def snapshot() -> Dict[str, Any]:
+    '''
+    Copy of all recorded metrics.
+    Returns:
+        {"histograms": {name: [{"labels", "count", "sum", "mean", "p50", "p99", "buckets"}]},
+         "counters": {name: [{"labels", "value"}]}}
+        where `buckets` maps each upper bound to its cumulative count and p50/p99 are
+        bucket upper bounds.
+    '''
+    with _registry.lock:
+        histograms = {
+            name: [
+                {
+                    "labels": dict(key),
+                    "count": h.count,
+                    "sum": h.sum,
+                    "mean": h.sum / h.count if h.count else 0.0,
+                    "p50": h.quantile(0.5),
+                    "p99": h.quantile(0.99),
+                    "buckets": dict(zip([*map(str, h.buckets), "+Inf"], _cumulative(h.counts))),
+                }
+                for key, h in series.items()
+            ]
+            for name, series in _registry.histograms.items()
+        }
+        counters = {
+            name: [{"labels": dict(key), "value": value} for key, value in series.items()]
+            for name, series in _registry.counters.items()
+        }
+    return {"histograms": histograms, "counters": counters}
+
+
+def _cumulative(counts):
+    total, out = 0, []
+    for count in counts:
+        total += count
+        out.append(total)
+    return out
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(labels: Dict[str, str], **extra: str) -> str:
+    items = {**labels, **extra}
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in items.items()) + "}"
+
+
+def to_prometheus() -> str:
+    '''
+    Render all metrics in the Prometheus text exposition format (version 0.0.4).
+    '''
+    snap = snapshot()
+    lines = []
+    for name, series in sorted(snap["histograms"].items()):
+        lines.append(f"# TYPE {name} histogram")
+        for entry in series:
+            for bound, count in entry["buckets"].items():
+                lines.append(f"{name}_bucket{_format_labels(entry['labels'], le=bound)} {count}")
+            lines.append(f"{name}_sum{_format_labels(entry['labels'])} {entry['sum']}")
+            lines.append(f"{name}_count{_format_labels(entry['labels'])} {entry['count']}")
+    for name, series in sorted(snap["counters"].items()):
+        lines.append(f"# TYPE {name} counter")
+        for entry in series:
+            lines.append(f"{name}{_format_labels(entry['labels'])} {entry['value']}")
+    return "\n".join(lines) + "\n"
+
+
+def serve_metrics(port: int = METRICS_PORT, host: str = "127.0.0.1"):
+    '''
+    Serve `to_prometheus()` at http://host:port/metrics from a daemon thread.
+    Returns:
+        server: http.server.ThreadingHTTPServer; call `shutdown()` to stop it
+    '''
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = to_prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="depths-metrics", daemon=True).start()
+    return server
@@ -0,0 +1,32 @@
+import copy
+
+from depths.bench import compare_benchmarks, run_benchmarks
+
+def test_benchmark_report_and_compare():
+    report=run_benchmarks(suites=["quantize", "search"], rows=[200], dims=[64], batch_sizes=[1, 8], repeats=2)
+    names={r["name"] for r in report["results"]}
+    assert names == {"index.binary_quantize_batch", "index.binary_vector_search"}
+    for result in report["results"]:
+        assert result["p50_ms"] > 0 and result["max_ms"] >= result["p50_ms"]
+        assert (result["p99_ms"] is None) == (result["repeats"] < 100)
+        assert result["throughput"] > 0 and result["peak_rss_mb"] > 0
+    assert report["meta"]["rows"] == [200]
+
+    slower=copy.deepcopy(report)
+    slower["results"][0]["p50_ms"]*=2
+    rows=compare_benchmarks(report, slower)
+    assert len(rows) == len(report["results"])
+    assert [row["regression"] for row in rows] == [True] + [False] * (len(rows) - 1)
+
+def test_io_and_delta_batch_size_sweeps():
+    report=run_benchmarks(suites=["io", "delta"], rows=[100], dims=[16], batch_sizes=[1, 32], repeats=2)
+    swept={(r["name"], r["params"].get("batch_size")) for r in report["results"]}
+    for name in ("io.write_batches_stream_ipc", "io.read_batch_from_file", "delta.append"):
+        assert {(name, 1), (name, 32)} <= swept
+    reads=[r for r in report["results"] if r["name"] == "io.read_batch_from_file"]
+    assert all(r["p99_ms"] is not None for r in reads)
+
+if __name__ == "__main__":
+    test_benchmark_report_and_compare()
+    test_io_and_delta_batch_size_sweeps()
+    print("Test passed ✅")
@@ -0,0 +1,66 @@
+import asyncio
+import json
+import os
+import tempfile
+
+import numpy as np
+import polars as pl
+from deltalake import DeltaTable
+
+from depths.index import binary_projection, binary_quantize_batch
+from depths.index.build import build_index
+from depths.io.delta import create_delta
+
+class _Interrupt(Exception):
+    pass
+
+def _table(tmp, rows=1000, dims=64, files=4):
+    rng=np.random.default_rng(0)
+    x=rng.standard_normal((rows, dims)).astype(np.float32)
+    x/=np.linalg.norm(x, axis=1, keepdims=True)
+    df=pl.DataFrame({"doc": [f"doc-{i}" for i in range(rows)], "embedding": pl.Series("embedding", x)})
+    path=os.path.join(tmp, "table")
+    for chunk in df.iter_slices(rows // files):
+        asyncio.run(create_delta(path, chunk, mode="append"))
+    # Index rows follow the table's file order, not insertion order.
+    order=[int(d.split("-")[1]) for d in DeltaTable(path).to_pyarrow_dataset().to_table(columns=["doc"])["doc"].to_pylist()]
+    return path, x[order], order
+
+def test_build_index_streams_and_resumes():
+    with tempfile.TemporaryDirectory() as tmp:
+        path, x, order=_table(tmp)
+        out=os.path.join(tmp, "index")
+        seen=[]
+
+        def interrupt(update):
+            seen.append(update)
+            # 4 files of 250 rows -> 2 parts each; stop halfway through the third file.
+            if update["parts"] == 5:
+                raise _Interrupt()
+
+        try:
+            build_index(path, out, id_column="doc", batch_rows=128, num_workers=2, num_clusters=8, progress=interrupt)
+        except _Interrupt:
+            pass
+        with open(os.path.join(out, "checkpoint.json")) as f:
+            checkpoint=json.load(f)
+        assert checkpoint["fragments"] == 2 and checkpoint["parts"] == 4 and checkpoint["rows"] == 500
+
+        resumed=[]
+        manifest=build_index(path, out, id_column="doc", batch_rows=128, num_workers=2, num_clusters=8,
+                             progress=resumed.append)
+        # Only the unfinished third file is read again; the first two are skipped.
+        assert [u["parts"] for u in resumed] == [5, 6, 7, 8] and resumed[-1]["rows"] == 1000
+        assert manifest["rows"] == 1000 and manifest["dims"] == 64
+
+        codes=np.load(os.path.join(out, "codes.npy"))
+        assert np.array_equal(codes, binary_quantize_batch(x, binary_projection(64)))
+        ids=pl.read_parquet(os.path.join(out, "ids.parquet"))["doc"].to_list()
+        assert ids == [f"doc-{i}" for i in order]
+        labels=np.load(os.path.join(out, "labels.npy"))
+        assert labels.shape == (1000, 3) and labels.max() < 8
+        assert not os.path.exists(os.path.join(out, "parts"))
+
+if __name__ == "__main__":
+    test_build_index_streams_and_resumes()
+    print("Test passed ✅")
@@ -0,0 +1,131 @@
+import asyncio
+import os
+import tempfile
+import time
+
+import polars as pl
+from deltalake.exceptions import CommitFailedError
+
+from depths.io import delta
+from depths.io.delta import create_delta, create_deltas, read_deltas
+
+def test_concurrent_tables_round_trip():
+    with tempfile.TemporaryDirectory() as tmp:
+        tables={
+            os.path.join(tmp, f"tenant-{i}"): pl.DataFrame({"id": list(range(i, i + 50)), "tenant": [f"t{i}"] * 50})
+            for i in range(6)
+        }
+        assert asyncio.run(create_deltas(tables, max_concurrency=2)) == [None] * 6
+        frames=asyncio.run(read_deltas(list(tables), max_concurrency=3))
+        for (path, expected), frame in zip(tables.items(), frames):
+            assert frame.sort("id").equals(expected)
+
+        failures=asyncio.run(read_deltas([os.path.join(tmp, "missing")], return_exceptions=True))
+        assert isinstance(failures[0], ValueError)
+
+def test_writes_do_not_block_the_event_loop():
+    original=delta._write_delta
+    delta._write_delta=lambda *args: time.sleep(0.2)
+    try:
+        async def run():
+            ticks=0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    ticks+=1
+                    await asyncio.sleep(0.01)
+
+            task=asyncio.create_task(ticker())
+            start=time.perf_counter()
+            await create_deltas({f"t{i}": pl.DataFrame({"a": [i]}) for i in range(4)}, max_concurrency=4)
+            elapsed=time.perf_counter() - start
+            task.cancel()
+            return elapsed, ticks
+
+        elapsed, ticks=asyncio.run(run())
+        assert elapsed < 0.6 and ticks >= 10
+    finally:
+        delta._write_delta=original
+
+def test_retries_only_commit_conflicts():
+    original=delta._write_delta
+    calls=[]
+
+    def conflict_twice(*args):
+        calls.append(args)
+        if len(calls) < 3:
+            raise CommitFailedError("version already exists")
+
+    def bad_schema(*args):
+        calls.append(args)
+        raise ValueError("schema mismatch")
+
+    try:
+        delta._write_delta=conflict_twice
+        asyncio.run(create_delta("unused", pl.DataFrame({"a": [1]}), num_retries=3))
+        assert len(calls) == 3
+
+        calls.clear()
+        delta._write_delta=bad_schema
+        try:
+            asyncio.run(create_delta("unused", pl.DataFrame({"a": [1]}), num_retries=3))
+            raise AssertionError("expected ValueError")
+        except ValueError:
+            pass
+        assert len(calls) == 1
+    finally:
+        delta._write_delta=original
+
+def test_retries_transient_object_store_errors():
+    original=delta._write_delta
+    calls=[]
+
+    def flaky_network(*args):
+        calls.append(args)
+        if len(calls) < 2:
+            raise OSError("Generic S3 error: Error after 0 retries in 30s, max_retries:10, "
+                          "retry_timeout:180s, source:error sending request for url (https://bucket.s3.amazonaws.com/t)")
+
+    def missing_file(*args):
+        calls.append(args)
+        raise FileNotFoundError("Object at location t/_delta_log not found")
+
+    def forbidden(*args):
+        calls.append(args)
+        raise OSError("Generic S3 error: Error after 0 retries in 10ms, max_retries:10, retry_timeout:180s, "
+                      "source:Client error with status 403 Forbidden: <Code>AccessDenied</Code>")
+
+    try:
+        delta._write_delta=flaky_network
+        asyncio.run(create_delta("unused", pl.DataFrame({"a": [1]}), num_retries=3))
+        assert len(calls) == 2
+
+        calls.clear()
+        delta._write_delta=missing_file
+        try:
+            asyncio.run(create_delta("unused", pl.DataFrame({"a": [1]}), num_retries=3))
+            raise AssertionError("expected FileNotFoundError")
+        except FileNotFoundError:
+            pass
+        assert len(calls) == 1
+
+        calls.clear()
+        delta._write_delta=forbidden
+        try:
+            asyncio.run(create_delta("unused", pl.DataFrame({"a": [1]}), num_retries=3))
+            raise AssertionError("expected OSError")
+        except OSError as e:
+            assert "403 Forbidden" in str(e)
+        assert len(calls) == 1
+        assert delta._is_retriable(OSError("Generic S3 error: source:Server error with status 503 Service Unavailable"))
+        assert delta._is_retriable(OSError("Generic LocalFileSystem error: operation timed out"))
+    finally:
+        delta._write_delta=original
+
+if __name__ == "__main__":
+    test_concurrent_tables_round_trip()
+    test_writes_do_not_block_the_event_loop()
+    test_retries_only_commit_conflicts()
+    test_retries_transient_object_store_errors()
+    print("Test passed ✅")
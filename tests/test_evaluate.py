@@ -0,0 +1,31 @@
+import numpy as np
+
+from depths.index.evaluate import SearchConfig, evaluate_search, exact_ground_truth, synthetic_embeddings
+
+def test_exact_ground_truth_matches_brute_force():
+    docs, queries=synthetic_embeddings(3000, 20, 32, seed=1)
+    idxs, scores=exact_ground_truth(queries, docs, top_k=5, chunk_rows=700, num_threads=3)
+    expected=np.argsort(-(queries @ docs.T), axis=1, kind="stable")[:, :5]
+    assert np.array_equal(idxs, expected)
+    assert np.all(np.diff(scores, axis=1) <= 0)
+
+def test_evaluate_search_reports_recall_and_qps():
+    docs, queries=synthetic_embeddings(2000, 50, 64, num_clusters=20)
+    configs=[
+        SearchConfig("binary"),
+        SearchConfig("binary", oversample=8),
+        SearchConfig("scalar", oversample=2),
+        SearchConfig("kcenter", num_centers=16, num_probes=16),
+    ]
+    report=evaluate_search(docs, queries, configs, top_k=10, repeats=1)
+    recall={row["name"]: row["recall@10"] for row in report}
+    assert recall["binary(oversample=8)"] >= recall["binary(oversample=1)"]
+    assert recall["int8(oversample=2)"] > 0.9
+    assert recall["kcenter(K=16,L=3,probes=16)"] == 1.0
+    assert all(row["qps"] > 0 for row in report)
+    assert report[0]["build_seconds"] == report[1]["build_seconds"]
+
+if __name__ == "__main__":
+    test_exact_ground_truth_matches_brute_force()
+    test_evaluate_search_reports_recall_and_qps()
+    print("Test passed ✅")
@@ -0,0 +1,55 @@
+import subprocess
+import sys
+
+HEAVY_MODULES=("numba", "openai", "deltalake")
+
+# cumulative import time budgets (ms) as reported by `python -X importtime`
+IMPORT_BUDGETS_MS={
+    "depths": 20,
+    "depths.io": 20,
+    "depths.logger": 20,
+    "depths.index": 400,
+}
+
+def _cumulative_import_ms(module: str) -> float:
+    proc=subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True,
+    )
+    for line in proc.stderr.splitlines():
+        parts=[p.strip() for p in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1]) / 1e3
+    raise AssertionError(f"{module} not found in -X importtime output")
+
+def test_import_time_budgets():
+    for module, budget in IMPORT_BUDGETS_MS.items():
+        elapsed=_cumulative_import_ms(module)
+        print(f"import {module}: {elapsed:.2f} ms (budget {budget} ms)")
+        assert elapsed < budget, f"import {module} took {elapsed:.2f} ms, budget is {budget} ms"
+
+def test_heavy_dependencies_are_lazy():
+    code=(
+        "import sys\n"
+        "import depths, depths.index, depths.io, depths.io.delta, depths.logger, depths.logger.llm\n"
+        "print(','.join(m for m in sys.argv[1:] if m in sys.modules))\n"
+    )
+    proc=subprocess.run(
+        [sys.executable, "-c", code, *HEAVY_MODULES],
+        capture_output=True, text=True, check=True,
+    )
+    loaded=proc.stdout.strip()
+    assert loaded == "", f"heavy modules imported eagerly: {loaded}"
+
+def test_lazy_exports_resolve():
+    import depths.io
+    import depths.logger
+    assert callable(depths.io.read_delta)
+    assert "create_delta" in dir(depths.io)
+    assert depths.logger.DepthsLogger is not None
+
+if __name__ == "__main__":
+    test_import_time_budgets()
+    test_heavy_dependencies_are_lazy()
+    test_lazy_exports_resolve()
+    print("Test passed ✅")
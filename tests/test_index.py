@@ -0,0 +1,243 @@
+import os
+import numpy as np
+import polars as pl
+from shutil import rmtree
+
+from depths.index import (
+    binary_quantize_batch,
+    binary_vector_search,
+    greedy_k_center,
+    fit_scalar_scales,
+    scalar_quantize_batch,
+    scalar_vector_search,
+    scalar_codes_to_frame,
+    scalar_codes_from_frame,
+)
+
+NUM_DOCS=500
+NUM_QUERIES=8
+NUM_DIMS=128
+TOP_K=10
+
+def _unit_docs(dtype=np.float32, seed=0):
+    rng=np.random.default_rng(seed)
+    docs=rng.standard_normal((NUM_DOCS, NUM_DIMS)).astype(dtype)
+    return docs/np.linalg.norm(docs, axis=1, keepdims=True)
+
+def _hamming(a, b):
+    return np.unpackbits((a[:, None, :] ^ b[None, :, :]).view(np.uint8), axis=-1).sum(axis=-1)
+
+def test_binary_search_matches_brute_force():
+    for dtype in (np.float32, np.float64):
+        docs=_unit_docs(dtype)
+        codes=binary_quantize_batch(docs)
+        assert codes.shape == (NUM_DOCS, NUM_DIMS // 64) and codes.dtype == np.uint64
+
+        queries=codes[:NUM_QUERIES]
+        idxs=binary_vector_search(queries, codes, TOP_K)
+        assert idxs.shape == (NUM_QUERIES, TOP_K)
+
+        dists=_hamming(queries, codes)
+        for q in range(NUM_QUERIES):
+            got=dists[q, idxs[q]]
+            assert np.all(np.diff(got) >= 0), "results not sorted by distance"
+            assert np.array_equal(got, np.sort(dists[q])[:TOP_K]), "top-k mismatch"
+
+def test_greedy_k_center():
+    for dtype in (np.float32, np.float64):
+        docs=_unit_docs(dtype)
+        centers, labels, centers_idx=greedy_k_center(docs, 16, num_centers=3, dtype=dtype)
+        assert centers.shape == (16, NUM_DIMS)
+        assert len(set(centers_idx.tolist())) == 16
+        assert labels.shape == (NUM_DOCS, 3)
+        assert labels.min() >= 0 and labels.max() < 16
+        # each center is its own nearest center
+        assert np.array_equal(labels[centers_idx, 0], np.arange(16))
+
+def test_blas_assignment_matches_kernel():
+    from depths.index.kcenter import assign_labels_topL, assign_labels_topL_blas
+
+    docs=_unit_docs()
+    centers_idx=np.arange(0, NUM_DOCS, 7, dtype=np.int16)
+    centers=docs[centers_idx]
+    for normalized in (True, False):
+        kernel=assign_labels_topL(docs, centers_idx, 3, normalized)
+        # tiny blocks to exercise chunking
+        blas=assign_labels_topL_blas(docs, centers_idx, 3, normalized, block_bytes=4096)
+        assert blas.shape == kernel.shape == (NUM_DOCS, 3)
+        d_kernel=((docs[:, None, :] - centers[kernel]) ** 2).sum(-1)
+        d_blas=((docs[:, None, :] - centers[blas]) ** 2).sum(-1)
+        assert np.allclose(d_kernel, d_blas, atol=1e-5)
+
+    labels=assign_labels_topL_blas(docs, centers_idx[:2], 5, True)
+    assert labels.shape == (NUM_DOCS, 2)
+
+def test_kcenter_search_matches_exact():
+    from depths.index.kcenter import kcenter_inverted_lists, kcenter_vector_search
+
+    docs=_unit_docs()
+    queries=_unit_docs(seed=1)[:NUM_QUERIES]
+    centers, labels, _=greedy_k_center(docs, 16, num_centers=3)
+    offsets, members=kcenter_inverted_lists(labels, 16)
+    # probing every center scores every document exactly once
+    found, scores=kcenter_vector_search(queries, docs, centers, offsets, members, TOP_K, 16)
+    exact=np.argsort(-(queries @ docs.T), axis=1)[:, :TOP_K]
+    assert np.array_equal(found, exact)
+    assert np.allclose(scores, np.take_along_axis(queries @ docs.T, exact, axis=1), atol=1e-5)
+
+    # fewer candidates than top_k: no duplicates, padded with -1 / -inf
+    tiny_offsets=np.array([0, 3, 5], dtype=np.int64)
+    tiny_members=np.array([0, 1, 2, 1, 2], dtype=np.int64)
+    found, scores=kcenter_vector_search(queries, docs, centers[:2], tiny_offsets, tiny_members, 5, 2)
+    assert np.array_equal(np.sort(found[:, :3], axis=1), np.tile([0, 1, 2], (NUM_QUERIES, 1)))
+    assert np.all(found[:, 3:] == -1) and np.all(np.isneginf(scores[:, 3:]))
+
+def _readonly(a):
+    a=np.array(a)
+    a.setflags(write=False)
+    return a
+
+def test_readonly_inputs():
+    from depths.index import MutableBinaryIndex
+    from depths.index.kcenter import kcenter_inverted_lists, kcenter_vector_search
+
+    docs=_unit_docs()
+    codes=binary_quantize_batch(docs)
+    queries=np.frombuffer(codes[:NUM_QUERIES].tobytes(), dtype=np.uint64).reshape(NUM_QUERIES, -1)
+    assert not queries.flags.writeable
+    expected=binary_vector_search(codes[:NUM_QUERIES], codes, TOP_K)
+    for docs_codes in (codes, _readonly(codes)):
+        assert np.array_equal(binary_vector_search(queries, docs_codes, TOP_K), expected)
+
+    try:
+        os.makedirs("toy_readonly", exist_ok=True)
+        np.save("toy_readonly/docs.npy", docs)
+        mapped=np.load("toy_readonly/docs.npy", mmap_mode="r")
+        for dtype in (np.float32, np.float64):
+            for use_blas in (False, True):
+                centers, labels, centers_idx=greedy_k_center(
+                    mapped.astype(dtype, copy=False), 16, num_centers=3, dtype=dtype, use_blas=use_blas
+                )
+                assert labels.shape == (NUM_DOCS, 3) and len(set(centers_idx.tolist())) == 16
+
+        centers, labels, _=greedy_k_center(docs, 16, num_centers=3)
+        offsets, members=kcenter_inverted_lists(labels, 16)
+        found, _=kcenter_vector_search(_readonly(docs[:NUM_QUERIES]), mapped, centers, offsets, members, TOP_K, 4)
+        assert np.array_equal(found[:, 0], np.arange(NUM_QUERIES))
+        del mapped
+    finally:
+        rmtree("toy_readonly")
+
+    index=MutableBinaryIndex(NUM_DIMS)
+    index.add(docs)
+    found, _=index.search_codes(queries, TOP_K)
+    assert np.array_equal(found[:, 0], np.arange(NUM_QUERIES))
+
+def _recall(found, exact):
+    return np.mean([len(set(a) & set(b)) / exact.shape[1] for a, b in zip(found, exact)])
+
+def test_scalar_search_recall():
+    docs=_unit_docs()
+    queries=_unit_docs(seed=1)[:NUM_QUERIES]
+    exact=np.argsort(-(queries @ docs.T), axis=1)[:, :TOP_K]
+
+    for bits, min_recall in ((8, 0.9), (4, 0.6)):
+        for scales in (fit_scalar_scales(docs, bits), None):
+            codes, row_scales=scalar_quantize_batch(docs, scales, bits)
+            assert (row_scales is None) == (scales is not None)
+            idxs, scores=scalar_vector_search(queries, codes, scales, row_scales, TOP_K, bits)
+            assert idxs.shape == scores.shape == (NUM_QUERIES, TOP_K)
+            assert np.all(np.diff(scores, axis=1) <= 0), "scores not sorted"
+            assert _recall(idxs, exact) >= min_recall
+            true_scores=np.take_along_axis(queries @ docs.T, idxs, axis=1)
+            assert np.allclose(scores, true_scores, atol=0.05 if bits == 8 else 0.2)
+
+def test_scalar_search_rejects_mismatched_inputs():
+    docs=_unit_docs()
+    queries=_unit_docs(seed=1)[:NUM_QUERIES]
+    codes, row_scales=scalar_quantize_batch(docs)
+    packed, packed_scales=scalar_quantize_batch(docs, bits=4)
+    bad_calls=[
+        lambda: scalar_vector_search(queries[:, :NUM_DIMS // 2], codes, row_scales=row_scales),
+        lambda: scalar_vector_search(np.hstack([queries, queries]), codes, row_scales=row_scales),
+        lambda: scalar_vector_search(queries, packed, row_scales=packed_scales, bits=8),
+        lambda: scalar_vector_search(queries, codes, row_scales=row_scales, bits=4),
+        lambda: scalar_vector_search(queries, codes, row_scales=row_scales[:-1]),
+        lambda: scalar_vector_search(queries, codes, scales=np.ones(NUM_DIMS - 1)),
+    ]
+    for call in bad_calls:
+        try:
+            call()
+        except ValueError:
+            continue
+        raise AssertionError("expected ValueError")
+
+def test_int4_pack_roundtrip():
+    from depths.index.scalar import pack_int4, unpack_int4
+
+    codes=np.random.default_rng(0).integers(-7, 8, (5, 11)).astype(np.int8)
+    packed=pack_int4(codes)
+    assert packed.shape == (5, 6) and packed.dtype == np.uint8
+    assert np.array_equal(unpack_int4(packed, 11), codes)
+
+def _search_roundtrip(read_back):
+    docs=_unit_docs()
+    queries=_unit_docs(seed=1)[:NUM_QUERIES]
+    for bits in (8, 4):
+        codes, row_scales=scalar_quantize_batch(docs, bits=bits)
+        df=scalar_codes_to_frame(codes, row_scales, ids=np.arange(NUM_DOCS))
+        assert df.schema["codes"] == pl.Array(pl.Int8, codes.shape[1])
+        codes_back, scales_back=scalar_codes_from_frame(read_back(df, bits))
+        assert codes_back.dtype == codes.dtype and np.array_equal(codes_back, codes)
+        assert np.array_equal(scales_back, row_scales)
+        expected=scalar_vector_search(queries, codes, row_scales=row_scales, top_k=TOP_K, bits=bits)
+        found=scalar_vector_search(queries, codes_back, row_scales=scales_back, top_k=TOP_K, bits=bits)
+        assert np.array_equal(found[0], expected[0]) and np.allclose(found[1], expected[1])
+
+def test_scalar_codes_ipc_roundtrip():
+    from depths.io.arrow import write_batches_stream_ipc, read_batch_from_file
+
+    def ipc(df, bits):
+        index=write_batches_stream_ipc([df], f"toy_scalar/codes{bits}.arrow")
+        return read_batch_from_file(f"toy_scalar/codes{bits}.arrow", 0, pl.DataFrame(index))
+
+    try:
+        os.makedirs("toy_scalar", exist_ok=True)
+        _search_roundtrip(ipc)
+        # mmapped codes are read-only
+        codes, row_scales=scalar_quantize_batch(_unit_docs())
+        np.save("toy_scalar/codes.npy", codes)
+        mapped=np.load("toy_scalar/codes.npy", mmap_mode="r")
+        idxs, _=scalar_vector_search(_unit_docs()[:NUM_QUERIES], mapped, row_scales=row_scales, top_k=TOP_K)
+        assert np.array_equal(idxs[:, 0], np.arange(NUM_QUERIES))
+        del mapped
+    finally:
+        rmtree("toy_scalar")
+
+def test_scalar_codes_delta_roundtrip():
+    import asyncio
+    from depths.io.delta import create_delta, read_delta
+
+    def delta(df, bits):
+        asyncio.run(create_delta(f"toy_scalar_delta/codes{bits}", df))
+        back=asyncio.run(read_delta(f"toy_scalar_delta/codes{bits}"))
+        assert back.schema["codes"] == pl.List(pl.Int8)
+        return back.sort("id")
+
+    try:
+        _search_roundtrip(delta)
+    finally:
+        rmtree("toy_scalar_delta", ignore_errors=True)
+
+if __name__ == "__main__":
+    test_binary_search_matches_brute_force()
+    test_greedy_k_center()
+    test_blas_assignment_matches_kernel()
+    test_kcenter_search_matches_exact()
+    test_readonly_inputs()
+    test_scalar_search_recall()
+    test_scalar_search_rejects_mismatched_inputs()
+    test_int4_pack_roundtrip()
+    test_scalar_codes_ipc_roundtrip()
+    test_scalar_codes_delta_roundtrip()
+    print("Test passed ✅")
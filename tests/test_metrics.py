@@ -0,0 +1,68 @@
+import os
+import urllib.request
+from shutil import rmtree
+import numpy as np
+import polars as pl
+
+from depths import metrics
+from depths.io.arrow import write_per_row_stream_ipc, read_row_from_file
+from depths.index import binary_quantize_batch, binary_vector_search
+
+NUM_ROWS=20
+NUM_DIMS=64
+
+def _workload():
+    vectors=np.random.default_rng(0).standard_normal((NUM_ROWS, NUM_DIMS)).astype(np.float32)
+    df=pl.DataFrame({"id": np.arange(NUM_ROWS), "embedding": pl.Series("embedding", vectors)})
+    try:
+        os.makedirs("toy_metrics", exist_ok=True)
+        index=pl.DataFrame(write_per_row_stream_ipc(df, "toy_metrics/rows.arrow"))
+        read_row_from_file("toy_metrics/rows.arrow", 3, index)
+    finally:
+        rmtree("toy_metrics")
+    codes=binary_quantize_batch(vectors)
+    binary_vector_search(codes[:4], codes, 5)
+
+def test_disabled_records_nothing():
+    metrics.disable()
+    metrics.reset()
+    _workload()
+    assert metrics.snapshot() == {"histograms": {}, "counters": {}}
+    assert metrics.timed("x") is metrics.timed("y"), "disabled timer should be a shared no-op"
+
+def test_enabled_snapshot_and_prometheus():
+    metrics.reset()
+    metrics.enable()
+    try:
+        _workload()
+    finally:
+        metrics.disable()
+
+    snap=metrics.snapshot()
+    for name in ("depths_io_write_seconds", "depths_io_read_seconds", "depths_quantize_seconds", "depths_search_seconds"):
+        assert name in snap["histograms"], name
+    counters={name: sum(e["value"] for e in series) for name, series in snap["counters"].items()}
+    assert counters["depths_io_write_items_total"] == NUM_ROWS
+    assert counters["depths_io_write_bytes_total"] > counters["depths_io_read_bytes_total"] > 0
+    assert counters["depths_quantize_vectors_total"] == NUM_ROWS
+    assert counters["depths_search_queries_total"] == 4
+
+    text=metrics.to_prometheus()
+    assert "# TYPE depths_search_seconds histogram" in text
+    assert 'depths_search_seconds_bucket{kind="binary",le="+Inf"} 1' in text
+    assert 'depths_search_queries_total{kind="binary"} 4' in text
+
+    server=metrics.serve_metrics(port=0)
+    try:
+        port=server.server_address[1]
+        body=urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics").read().decode()
+        assert body == text
+    finally:
+        server.shutdown()
+        server.server_close()
+    metrics.reset()
+
+if __name__ == "__main__":
+    test_disabled_records_nothing()
+    test_enabled_snapshot_and_prometheus()
+    print("Test passed ✅")
@@ -0,0 +1,139 @@
+import threading
+import numpy as np
+
+from depths.index import MutableBinaryIndex, SearchCache
+
+NUM_DOCS=2000
+NUM_DIMS=128
+TOP_K=5
+
+def _unit(n, seed=0):
+    rng=np.random.default_rng(seed)
+    x=rng.standard_normal((n, NUM_DIMS)).astype(np.float32)
+    return x/np.linalg.norm(x, axis=1, keepdims=True)
+
+def test_add_delete_search():
+    docs=_unit(NUM_DOCS)
+    index=MutableBinaryIndex(NUM_DIMS, segment_capacity=300)
+    ids=np.concatenate([index.add(docs[i:i+250]) for i in range(0, NUM_DOCS, 250)])
+    assert np.array_equal(ids, np.arange(NUM_DOCS))
+    assert len(index) == NUM_DOCS and index.num_segments > 1
+
+    found, dists=index.search(docs[:10], TOP_K)
+    assert found.shape == dists.shape == (10, TOP_K)
+    assert np.array_equal(found[:, 0], np.arange(10)), "a doc should be its own nearest neighbour"
+
+    assert index.delete(np.arange(10)) == 10
+    assert index.delete(np.arange(10)) == 0
+    found, _=index.search(docs[:10], TOP_K)
+    assert not np.isin(found, np.arange(10)).any(), "deleted docs returned"
+    assert len(index) == NUM_DOCS - 10
+
+def test_upsert_and_short_results():
+    docs=_unit(3)
+    index=MutableBinaryIndex(NUM_DIMS)
+    index.add(docs, ids=np.array([7, 8, 9]))
+    index.add(docs[:1], ids=np.array([8]))
+    assert len(index) == 3
+    found, dists=index.search(docs[:1], TOP_K)
+    assert set(found[0, :2].tolist()) == {7, 8}
+    assert np.array_equal(found[0, 3:], [-1, -1])
+
+def test_duplicate_ids_in_one_add():
+    docs=_unit(3)
+    index=MutableBinaryIndex(NUM_DIMS)
+    added=index.add(docs, ids=np.array([5, 5, 6]))
+    assert np.array_equal(added, [5, 6])
+    assert len(index) == 2
+    found, _=index.search(docs[1:2], TOP_K)
+    assert found[0, 0] == 5, "the last occurrence of a duplicate id should win"
+    assert index.delete([5]) == 1
+    found, _=index.search(docs[:3], TOP_K)
+    assert not np.isin(found, [5]).any(), "deleted duplicate id returned"
+    assert len(index) == 1 == (found[0] >= 0).sum()
+
+def test_merge_and_recluster():
+    docs=_unit(NUM_DOCS)
+    index=MutableBinaryIndex(NUM_DIMS, segment_capacity=256, keep_vectors=True, num_clusters=8)
+    index.add(docs)
+    index.delete(np.arange(0, NUM_DOCS, 2))
+    before, before_dists=index.search(docs[1:40:2], TOP_K)
+
+    index.merge()
+    assert index.num_segments == 1 and len(index) == NUM_DOCS // 2
+    after, after_dists=index.search(docs[1:40:2], TOP_K)
+    assert np.array_equal(before_dists, after_dists)
+    assert np.array_equal(before[:, 0], after[:, 0])
+
+    centers, labels, ids=index.clusters
+    assert centers.shape == (8, NUM_DIMS) and labels.shape[0] == ids.shape[0] == NUM_DOCS // 2
+
+    index.delete(np.array([1]))
+    found, _=index.search(docs[1:2], TOP_K)
+    assert 1 not in found
+
+def test_background_merge_with_concurrent_search():
+    docs=_unit(NUM_DOCS)
+    errors=[]
+    with MutableBinaryIndex(NUM_DIMS, segment_capacity=128, merge_min_segments=2) as index:
+        index.start_background_merge(interval=0.01)
+
+        def searcher():
+            try:
+                for _ in range(50):
+                    found, _=index.search(docs[:5], TOP_K)
+                    assert found.shape == (5, TOP_K)
+            except Exception as e:
+                errors.append(e)
+
+        threads=[threading.Thread(target=searcher) for _ in range(2)]
+        for t in threads:
+            t.start()
+        deleted=np.arange(0, NUM_DOCS, 3)
+        for i in range(0, NUM_DOCS, 100):
+            index.add(docs[i:i+100])
+            index.delete(deleted[(deleted >= i) & (deleted < i+100)])
+        for t in threads:
+            t.join()
+        index.merge()
+
+        assert not errors, errors
+        assert index.num_segments == 1
+        assert len(index) == NUM_DOCS - deleted.shape[0]
+        found, _=index.search(docs[deleted[:20]], TOP_K)
+        assert not np.isin(found, deleted).any()
+
+def test_result_cache():
+    docs=_unit(NUM_DOCS)
+    cache=SearchCache(max_entries=4)
+    index=MutableBinaryIndex(NUM_DIMS, cache=cache)
+    index.add(docs)
+
+    first=index.search(docs[:3], TOP_K)
+    second=index.search(docs[:3], TOP_K)
+    assert np.array_equal(first[0], second[0]) and np.array_equal(first[1], second[1])
+    stats=cache.stats()
+    assert stats["hits"] == 3 and stats["misses"] == 3 and stats["hit_rate"] == 0.5
+
+    index.search(docs[3:6], TOP_K)
+    assert cache.stats()["entries"] == 4 and cache.stats()["evictions"] == 2
+
+    index.delete(np.array([0]))
+    found, _=index.search(docs[:1], TOP_K)
+    assert 0 not in found, "stale cached result after delete"
+    assert cache.stats()["invalidations"] == 1
+
+    index.add(docs[:1], ids=np.array([0]))
+    found, _=index.search(docs[:1], TOP_K)
+    assert found[0, 0] == 0
+
+    assert SearchCache.make_key(docs[0], 5) != SearchCache.make_key(docs[0], 5, filter={"tenant": 1})
+
+if __name__ == "__main__":
+    test_add_delete_search()
+    test_upsert_and_short_results()
+    test_duplicate_ids_in_one_add()
+    test_merge_and_recluster()
+    test_background_merge_with_concurrent_search()
+    test_result_cache()
+    print("Test passed ✅")
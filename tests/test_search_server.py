@@ -0,0 +1,115 @@
+import os
+import tempfile
+import threading
+import time
+import numpy as np
+
+from depths.index import (
+    binary_quantize_batch,
+    SearchCache,
+    SearchService,
+    LocalTransport,
+    UnixSocketServer,
+    UnixSocketTransport,
+    save_codes,
+)
+
+NUM_DOCS=3000
+NUM_DIMS=128
+TOP_K=10
+
+def _codes():
+    rng=np.random.default_rng(0)
+    return binary_quantize_batch(rng.standard_normal((NUM_DOCS, NUM_DIMS)).astype(np.float32))
+
+def _hamming(a, b):
+    return np.unpackbits((a[:, None, :] ^ b[None, :, :]).view(np.uint8), axis=-1).sum(axis=-1)
+
+def test_sharded_search_transports():
+    codes=_codes()
+    queries=codes[:16]
+    expected=np.sort(_hamming(queries, codes), axis=1)[:, :TOP_K]
+    with tempfile.TemporaryDirectory() as tmp:
+        path=os.path.join(tmp, "codes.npy")
+        save_codes(path, codes)
+        with SearchService(path, num_shards=3, max_wait=0.02) as service:
+            assert len(service.shards) == 3
+
+            local=LocalTransport(service)
+            ids, dists=local.search(queries, TOP_K)
+            assert ids.shape == dists.shape == (16, TOP_K)
+            assert np.array_equal(dists, expected)
+            assert np.array_equal(np.take_along_axis(_hamming(queries, codes), ids, axis=1), dists)
+
+            results={}
+            def client(i):
+                results[i]=local.search(queries[i:i+1], TOP_K)
+            threads=[threading.Thread(target=client, args=(i,)) for i in range(16)]
+            batches_before=service.stats["batches"]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            for i in range(16):
+                assert np.array_equal(results[i][1][0], expected[i])
+            assert service.stats["batches"] - batches_before < 16, "requests were not micro-batched"
+
+            service.cache=SearchCache()
+            service.search(queries, TOP_K)
+            _, cached_dists=service.search(queries, TOP_K)
+            assert np.array_equal(cached_dists, expected)
+            assert service.cache.stats()["hits"] == 16
+
+            sock_path=os.path.join(tmp, "search.sock")
+            server=UnixSocketServer(service, sock_path).start()
+            try:
+                remote=UnixSocketTransport(sock_path)
+                ids_remote, dists_remote=remote.search(queries, 3)
+                assert np.array_equal(dists_remote, expected[:, :3])
+                assert ids_remote.dtype == np.int64
+                remote.close()
+            finally:
+                server.close()
+
+def test_close_resolves_pending_requests():
+    codes=_codes()
+    with tempfile.TemporaryDirectory() as tmp:
+        path=os.path.join(tmp, "codes.npy")
+        save_codes(path, codes)
+        service=SearchService(path, num_shards=1, max_wait=0.01)
+        futures=[]
+
+        def client():
+            while True:
+                try:
+                    futures.append(service.submit(codes[:4], TOP_K))
+                except RuntimeError:
+                    return
+
+        threads=[threading.Thread(target=client) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        deadline=time.monotonic() + 5
+        while len(futures) < 50 and time.monotonic() < deadline:
+            time.sleep(0.001)
+        service.close()
+        for thread in threads:
+            thread.join(timeout=5)
+            assert not thread.is_alive()
+
+        for future in futures:
+            try:
+                ids, _=future.result(timeout=5)
+                assert ids.shape == (4, TOP_K)
+            except RuntimeError as e:
+                assert "service closed" in str(e)
+        try:
+            service.search(codes[:1], TOP_K)
+            raise AssertionError("expected RuntimeError")
+        except RuntimeError:
+            pass
+
+if __name__ == "__main__":
+    test_sharded_search_transports()
+    test_close_resolves_pending_requests()
+    print("Test passed ✅")